@@ -0,0 +1,127 @@
+""" BioName 检索吞吐量的离线基准测试
+
+在本地启动模拟接口服务，按不同的学名数量和检索关键字计时，输出每秒检索的
+学名数以及请求数、重试数、限流次数和请求耗时等统计，例如：
+
+    python benchmarks/bench_bioname.py --sizes 10000 100000 --actions stdName colName \\
+        --latency 0.05 --jitter 0.05 --throttle-rate 0.01 --error-rate 0.005
+"""
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ipybd.function.bioname import BioName  # noqa: E402
+from ipybd.function.transport import RetryPolicy, Transport  # noqa: E402
+from mock_server import FIXTURES_DIR, GENERA, MockApiServer, synthetic_author  # noqa: E402
+
+
+def epithet(number):
+    """ 由序号生成仅含小写字母的种加词
+    """
+    letters = []
+    while True:
+        number, rest = divmod(number, 26)
+        letters.append(string.ascii_lowercase[rest])
+        if not number:
+            break
+    return 'x' + ''.join(letters) + 'ensis'
+
+
+def generate_names(size, duplicates=0.0, seed=0):
+    """ 生成 size 个带命名人的学名
+
+    duplicates: 重复学名所占的比例，用于模拟数据表中同一物种的多条记录
+    """
+    rng = random.Random(seed)
+    genera = sorted(GENERA)
+    unique = max(1, int(size * (1 - duplicates)))
+    names = []
+    for i in range(unique):
+        name = ' '.join([genera[i % len(genera)], epithet(i)])
+        names.append(' '.join([name, synthetic_author(name)]))
+    names.extend(rng.choice(names[:unique]) for _ in range(size - unique))
+    rng.shuffle(names)
+    return names
+
+
+def run(server, size, action, cascade='sequential', duplicates=0.0, backoff=1.0, seed=0):
+    """ 以新建的 Transport 和 BioName 检索一次，返回计时和统计结果
+    """
+    names = generate_names(size, duplicates, seed)
+    transport = Transport(limits=server.limits(), policy=RetryPolicy(backoff=backoff))
+    bioname = BioName(names, transport=transport, cascade=cascade, apis=server.apis)
+    start = time.monotonic()
+    results = bioname.get(action, typ=dict)
+    seconds = time.monotonic() - start
+    transport.close()
+    stats = bioname.stats.to_dict()
+    return {
+        'action': action,
+        'size': size,
+        'cascade': cascade,
+        'seconds': seconds,
+        'names_per_second': size / seconds if seconds else None,
+        'resolved': sum(1 for result in (results or {}).values() if result and result[0]),
+        'failures': len(getattr(bioname, 'failures', ())),
+        'stats': stats
+    }
+
+
+def summary(row):
+    requests = sum(p['requests'] for p in row['stats']['platforms'].values())
+    retries = sum(p['retries'] for p in row['stats']['platforms'].values())
+    throttled = sum(p['throttled'] for p in row['stats']['platforms'].values())
+    p95 = max(
+        (p['latency']['percentiles']['p95'] or 0 for p in row['stats']['platforms'].values()),
+        default=0)
+    return "{action:<18}{size:>9}{seconds:>10.1f}{rate:>12.0f}{resolved:>10}{failures:>9}{requests:>10}{retries:>9}{throttled:>9}{p95:>8.2f}".format(
+        rate=row['names_per_second'] or 0, requests=requests, retries=retries,
+        throttled=throttled, p95=p95, **row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000])
+    parser.add_argument('--actions', nargs='+', default=['stdName'])
+    parser.add_argument('--cascade', default='sequential', choices=['sequential', 'parallel', 'hedged'])
+    parser.add_argument('--duplicates', type=float, default=0.0, help='重复学名的比例')
+    parser.add_argument('--latency', type=float, default=0.05, help='模拟服务的基础响应延迟（秒）')
+    parser.add_argument('--jitter', type=float, default=0.05, help='附加随机延迟的上限（秒）')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='随机返回 429 的比例')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='随机返回 500 的比例')
+    parser.add_argument('--capacity', type=int, help='单个平台同时处理的请求数上限')
+    parser.add_argument('--retry-after', type=float, help='429 响应的 Retry-After 秒数')
+    parser.add_argument('--backoff', type=float, default=1.0, help='重试的基础退避间隔（秒）')
+    parser.add_argument('--fixtures', default=FIXTURES_DIR)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='将全部结果和统计写入该 JSON 文件')
+    args = parser.parse_args()
+
+    server = MockApiServer(
+        args.fixtures, latency=args.latency, jitter=args.jitter,
+        throttle_rate=args.throttle_rate, error_rate=args.error_rate,
+        capacity=args.capacity, retry_after=args.retry_after, seed=args.seed)
+    rows = []
+    with server:
+        for size in args.sizes:
+            for action in args.actions:
+                rows.append(run(server, size, action, args.cascade, args.duplicates, args.backoff, args.seed))
+    print("\n{:<18}{:>9}{:>10}{:>12}{:>10}{:>9}{:>10}{:>9}{:>9}{:>8}".format(
+        'action', 'names', 'seconds', 'names/s', 'resolved', 'failed', 'requests', 'retries', '429', 'p95'))
+    for row in rows:
+        print(summary(row))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'server': server.counts, 'results': rows},
+                      f, ensure_ascii=False, indent=1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,428 @@
+""" 模拟 COL、IPNI、POWO、Tropicos 接口的本地服务
+
+回放 fixtures 中录制的接口返回结果，录制结果中不存在的学名按各接口的返回
+结构合成结果，并可以注入响应延迟、限流（429）和服务端错误，以便在没有网络
+的环境下测试 BioName 的检索吞吐量。
+
+录制线上接口的返回结果：
+
+    python benchmarks/mock_server.py record names.txt --actions stdName colName
+
+单独运行模拟服务：
+
+    python benchmarks/mock_server.py serve --latency 0.05 --throttle-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import socket
+import sys
+import threading
+import time
+import zlib
+from urllib.parse import parse_qsl, urlsplit
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ipybd.function.bioname import DEFAULT_APIS, BioName  # noqa: E402
+from ipybd.function.transport import HOST_LIMITS, Transport  # noqa: E402
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+PLATFORMS = ('col', 'ipni', 'powo', 'tropicos')
+
+# 合成结果时各平台能够查到学名的比例，用于模拟 stdName 逐一检索各平台的情形
+DEFAULT_HIT_RATES = {'col': 0.9, 'ipni': 0.8, 'powo': 0.9, 'tropicos': 0.7}
+
+# 合成结果使用的属及其高级分类阶元：科、目、纲、门、界
+GENERA = {
+    'Abies': ('Pinaceae', 'Pinales', 'Pinopsida', 'Tracheophyta', 'Plantae'),
+    'Pinus': ('Pinaceae', 'Pinales', 'Pinopsida', 'Tracheophyta', 'Plantae'),
+    'Taxus': ('Taxaceae', 'Pinales', 'Pinopsida', 'Tracheophyta', 'Plantae'),
+    'Poa': ('Poaceae', 'Poales', 'Magnoliopsida', 'Tracheophyta', 'Plantae'),
+    'Carex': ('Cyperaceae', 'Poales', 'Magnoliopsida', 'Tracheophyta', 'Plantae'),
+    'Rhododendron': ('Ericaceae', 'Ericales', 'Magnoliopsida', 'Tracheophyta', 'Plantae'),
+    'Primula': ('Primulaceae', 'Ericales', 'Magnoliopsida', 'Tracheophyta', 'Plantae'),
+    'Salix': ('Salicaceae', 'Malpighiales', 'Magnoliopsida', 'Tracheophyta', 'Plantae'),
+    'Quercus': ('Fagaceae', 'Fagales', 'Magnoliopsida', 'Tracheophyta', 'Plantae'),
+    'Rosa': ('Rosaceae', 'Rosales', 'Magnoliopsida', 'Tracheophyta', 'Plantae'),
+    'Pedicularis': ('Orobanchaceae', 'Lamiales', 'Magnoliopsida', 'Tracheophyta', 'Plantae'),
+    'Saxifraga': ('Saxifragaceae', 'Saxifragales', 'Magnoliopsida', 'Tracheophyta', 'Plantae')
+}
+
+# 合成学名使用的命名人
+AUTHORS = (
+    'L.', 'Maxim.', 'Franch.', 'Hemsl.', '(Mast.) Craib', 'Hook. f. & Thomson',
+    'C. Y. Wu', 'Rehder & E. H. Wilson', '(Franch.) Diels', 'H. Lév.',
+    'W. W. Sm.', 'Hand.-Mazz.', 'Kom.', 'Turcz. ex Maxim.', 'Bunge'
+)
+
+# 各平台查无结果时的返回内容
+MISS_RESPONSES = {
+    'ipni': {'totalResults': 0, 'page': 1, 'perPage': 500},
+    'powo': {'totalResults': 0, 'page': 1, 'perPage': 500},
+    'tropicos': [{'Error': 'No names were found'}],
+    'col': {'code': 404, 'message': 'no data'}
+}
+
+
+def name_hash(*parts):
+    return zlib.crc32(':'.join(parts).encode('utf-8'))
+
+
+def synthetic_author(name):
+    """ 合成学名 name 的命名人，模拟服务和生成检索学名时使用同一规则
+    """
+    return AUTHORS[name_hash(name) % len(AUTHORS)]
+
+
+def fixture_key(platform, method, params):
+    """ 由请求的接口方法和参数获取录制结果的 key
+
+    method: 接口地址之后的路径，如 search、Search、123/AcceptedNames
+    params: 请求参数组成的字典
+
+    return: (route, name)
+    """
+    if platform in ('ipni', 'powo'):
+        return 'search', params.get('q', '')
+    elif platform == 'tropicos':
+        if method.endswith('/AcceptedNames'):
+            return 'AcceptedNames', method.split('/')[0]
+        # BioName 会将学名中的 "." 替换为 %2e
+        return method, params.get('name', '').replace('%2e', '.')
+    else:
+        name = params.get('scientificName') or params.get('familyName') or params.get('commonName', '')
+        return method, name
+
+
+def load_fixtures(directory=FIXTURES_DIR):
+    """ return: 平台:{route:{name:response}} 组成的字典
+    """
+    fixtures = {}
+    for platform in PLATFORMS:
+        path = os.path.join(directory, platform + '.json')
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                fixtures[platform] = json.load(f)
+    return fixtures
+
+
+class MockApiServer:
+    """ 在后台线程中运行的模拟接口服务
+
+    每个平台监听一个单独的端口，以便传输层按 host 分别控制并发，与线上环境一致
+    """
+
+    def __init__(self, fixtures=FIXTURES_DIR, latency=0.0, jitter=0.0, throttle_rate=0.0,
+                 error_rate=0.0, capacity=None, retry_after=None, hit_rates=None,
+                 synthesize=True, seed=0):
+        """
+        fixtures: 录制结果所在的文件夹，也可以是 load_fixtures 返回的字典
+        latency: 每次响应的基础延迟（秒）
+        jitter: 在基础延迟之上附加的随机延迟的上限（秒）
+        throttle_rate: 随机返回 429 的比例
+        error_rate: 随机返回 500 的比例
+        capacity: 单个平台同时处理的请求数上限，超出时返回 429，为 None 则不限制
+        retry_after: 返回 429 时 Retry-After 响应头的秒数，为 None 则不设置
+        hit_rates: 平台:比例 组成的字典，合成结果时各平台查到学名的比例
+        synthesize: 录制结果中不存在的学名是否合成结果，为 False 时返回查无结果
+        seed: 随机数种子
+        """
+        self.fixtures = load_fixtures(fixtures) if isinstance(fixtures, str) else fixtures
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.capacity = capacity
+        self.retry_after = retry_after
+        self.hit_rates = dict(DEFAULT_HIT_RATES)
+        if hit_rates:
+            self.hit_rates.update(hit_rates)
+        self.synthesize = synthesize
+        self.random = random.Random(seed)
+        self.inflight = dict.fromkeys(PLATFORMS, 0)
+        self.counts = {platform: {'requests': 0, 'throttled': 0, 'errors': 0} for platform in PLATFORMS}
+        self.tropicos_names = {}
+        self.apis = {}
+        self.loop = None
+        self.thread = None
+
+    def start(self, host='127.0.0.1'):
+        """ 在后台线程中启动服务
+
+        return: 平台:接口地址 组成的字典，可以直接作为 BioName 的 apis 参数
+        """
+        started = threading.Event()
+        sockets = {}
+        for platform in PLATFORMS:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((host, 0))
+            sockets[platform] = sock
+            self.apis[platform] = 'http://{0}:{1}/{2}'.format(host, sock.getsockname()[1], platform)
+
+        def serve():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            self.runner = web.AppRunner(self._build_app())
+            self.loop.run_until_complete(self.runner.setup())
+            for sock in sockets.values():
+                self.loop.run_until_complete(web.SockSite(self.runner, sock).start())
+            started.set()
+            self.loop.run_forever()
+            self.loop.run_until_complete(self.runner.cleanup())
+            self.loop.close()
+
+        self.thread = threading.Thread(target=serve, daemon=True)
+        self.thread.start()
+        started.wait()
+        return self.apis
+
+    def stop(self):
+        if self.loop is not None and self.thread.is_alive():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+
+    def limits(self):
+        """ 各平台模拟服务的 host 所对应的线上并发限制，用于构建 Transport
+        """
+        return {
+            urlsplit(api).netloc: dict(HOST_LIMITS[urlsplit(DEFAULT_APIS[platform]).netloc])
+            for platform, api in self.apis.items()
+        }
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _build_app(self):
+        app = web.Application()
+        app.router.add_get('/{platform}/{method:.+}', self.handle)
+        return app
+
+    async def handle(self, request):
+        platform = request.match_info['platform']
+        if platform not in self.counts:
+            raise web.HTTPNotFound()
+        counter = self.counts[platform]
+        counter['requests'] += 1
+        self.inflight[platform] += 1
+        try:
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+            if delay:
+                await asyncio.sleep(delay)
+            overloaded = self.capacity is not None and self.inflight[platform] > self.capacity
+            if overloaded or (self.throttle_rate and self.random.random() < self.throttle_rate):
+                counter['throttled'] += 1
+                headers = {'Retry-After': str(self.retry_after)} if self.retry_after is not None else None
+                return web.Response(status=429, headers=headers)
+            if self.error_rate and self.random.random() < self.error_rate:
+                counter['errors'] += 1
+                return web.Response(status=500)
+            params = dict(request.query)
+            return web.json_response(self.respond(platform, request.match_info['method'], params))
+        finally:
+            self.inflight[platform] -= 1
+
+    def respond(self, platform, method, params):
+        route, name = fixture_key(platform, method, params)
+        recorded = self.fixtures.get(platform, {}).get(route, {})
+        if name in recorded:
+            return recorded[name]
+        if not self.synthesize or not self._hit(platform, name, route):
+            return MISS_RESPONSES[platform]
+        if platform in ('ipni', 'powo'):
+            return {'totalResults': 1, 'page': 1, 'perPage': 500,
+                    'results': [getattr(self, '_' + platform)(name)]}
+        elif platform == 'tropicos':
+            if route == 'AcceptedNames':
+                return self._tropicos_accepted(name)
+            return [self._tropicos(name)]
+        elif route == 'getFamiliesByFamilyName':
+            return {'code': 200, 'message': 'success', 'data': {'familes': [self._col_family(name)]}}
+        return {'code': 200, 'message': 'success', 'data': {'species': [self._col_species(name)]}}
+
+    def _hit(self, platform, name, route):
+        if route == 'AcceptedNames':
+            return name in self.tropicos_names
+        if platform == 'col' and ' ' not in name:
+            # 属、科一级的检索
+            return True
+        return name_hash(platform, name) / 2 ** 32 < self.hit_rates.get(platform, 1.0)
+
+    def _taxonomy(self, name):
+        genus = name.split()[0]
+        return (genus,) + GENERA.get(genus, ('Incertae sedis',) + ('Incertae sedis',) * 2 + ('Tracheophyta', 'Plantae'))
+
+    def _ipni(self, name):
+        author = synthetic_author(name)
+        number = name_hash('ipni', name) % 10000000
+        return {
+            'name': name,
+            'authors': author,
+            'authorTeam': [
+                {'name': member} for member in
+                re.split(r'\s*(?:&|\bex\b|[()])\s*', author) if member
+            ],
+            'family': self._taxonomy(name)[1],
+            'rank': 'spec.',
+            'fqId': 'urn:lsid:ipni.org:names:{}-1'.format(number),
+            'publication': 'Bench. Fl.',
+            'publicationYear': 1900 + number % 120,
+            'referenceCollation': '{}: {}'.format(number % 50, number % 500),
+            'reference': 'Bench. Fl. {}: {}. {}'.format(number % 50, number % 500, 1900 + number % 120)
+        }
+
+    def _powo(self, name):
+        author = synthetic_author(name)
+        return {
+            'name': name,
+            'author': author,
+            'family': self._taxonomy(name)[1],
+            'rank': 'Species',
+            'accepted': True,
+            'kingdom': 'Plantae',
+            'fqId': 'urn:lsid:ipni.org:names:{}-1'.format(name_hash('ipni', name) % 10000000)
+        }
+
+    def _tropicos(self, name):
+        author = synthetic_author(name)
+        name_id = name_hash('tropicos', name) % 100000000
+        self.tropicos_names[str(name_id)] = name
+        return {
+            'NameId': name_id,
+            'ScientificName': name,
+            'ScientificNameWithAuthors': ' '.join([name, author]),
+            'Author': author,
+            'Family': self._taxonomy(name)[1],
+            'RankAbbreviation': 'sp.',
+            'NomenclatureStatusName': 'Legitimate'
+        }
+
+    def _tropicos_accepted(self, name_id):
+        name = self.tropicos_names[name_id]
+        return [{'AcceptedName': self._tropicos(name), 'Reference': {}}]
+
+    def _col_species(self, name):
+        genus, family, order, _class, phylum, kingdom = self._taxonomy(name)
+        author = synthetic_author(name)
+        code = '{:032x}'.format(name_hash('col', name))
+        return {
+            'name_code': code,
+            'scientific_name': name,
+            'author': author,
+            'name_status': 'accepted name',
+            'family': family,
+            'accepted_name_info': {
+                'namecode': code,
+                'scientificName': name,
+                'author': author,
+                'taxonTree': {
+                    'genus': genus, 'family': family, 'order': order,
+                    'class': _class, 'phylum': phylum, 'kingdom': kingdom
+                },
+                'Synonyms': []
+            }
+        }
+
+    def _col_family(self, name):
+        for family, order, _class, phylum, kingdom in GENERA.values():
+            if family == name:
+                break
+        else:
+            order = _class = 'Incertae sedis'
+            phylum, kingdom = 'Tracheophyta', 'Plantae'
+        return {
+            'family': name, 'order': order, 'class': _class, 'phylum': phylum,
+            'kingdom': kingdom, 'record_id': '{:032x}'.format(name_hash('col', name))
+        }
+
+
+class RecordingTransport(Transport):
+    """ 记录各接口返回结果的 Transport，用于录制 fixtures
+    """
+
+    def __init__(self, apis=None, **kwargs):
+        super().__init__(**kwargs)
+        self.apis = apis or dict(DEFAULT_APIS)
+        self.records = {}
+
+    async def request_json(self, url, *args, **kwargs):
+        response = await super().request_json(url, *args, **kwargs)
+        if response is None:
+            # 请求失败的结果不录制
+            return response
+        for platform, api in self.apis.items():
+            if url.startswith(api):
+                parts = urlsplit(url[len(api):])
+                route, name = fixture_key(platform, parts.path.strip('/'), dict(parse_qsl(parts.query)))
+                self.records.setdefault(platform, {}).setdefault(route, {})[name] = response
+                break
+        return response
+
+    def save(self, directory=FIXTURES_DIR):
+        """ 将录制结果合并写入 directory 中各平台的 fixtures 文件
+        """
+        fixtures = load_fixtures(directory)
+        for platform, routes in self.records.items():
+            for route, records in routes.items():
+                fixtures.setdefault(platform, {}).setdefault(route, {}).update(records)
+        for platform, routes in fixtures.items():
+            with open(os.path.join(directory, platform + '.json'), 'w', encoding='utf-8') as f:
+                json.dump(routes, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+
+def record(names, actions, directory=FIXTURES_DIR):
+    """ 检索线上接口，录制 names 的返回结果
+    """
+    transport = RecordingTransport()
+    bioname = BioName(names, transport=transport)
+    for action in actions:
+        bioname.get(action)
+    transport.save(directory)
+    transport.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    recorder = commands.add_parser('record', help='录制线上接口的返回结果')
+    recorder.add_argument('names', help='每行一个学名的文本文件')
+    recorder.add_argument('--actions', nargs='+', default=['stdName', 'colName'])
+    recorder.add_argument('--fixtures', default=FIXTURES_DIR)
+    server = commands.add_parser('serve', help='运行模拟服务')
+    server.add_argument('--latency', type=float, default=0.0)
+    server.add_argument('--jitter', type=float, default=0.0)
+    server.add_argument('--throttle-rate', type=float, default=0.0)
+    server.add_argument('--error-rate', type=float, default=0.0)
+    server.add_argument('--capacity', type=int)
+    server.add_argument('--fixtures', default=FIXTURES_DIR)
+    args = parser.parse_args()
+    if args.command == 'record':
+        with open(args.names, encoding='utf-8') as f:
+            names = [line.strip() for line in f if line.strip()]
+        record(names, args.actions, args.fixtures)
+    else:
+        mock = MockApiServer(
+            args.fixtures, latency=args.latency, jitter=args.jitter,
+            throttle_rate=args.throttle_rate, error_rate=args.error_rate, capacity=args.capacity)
+        print(json.dumps(mock.start(), indent=1))
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            mock.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -4,9 +4,22 @@ from ipybd.function.api_terms import Filters
 
 from ipybd.function.bioname import BioName
 
+from ipybd.function.checklist import LocalChecklist
+
+from ipybd.function.clean_cache import CleanCache
+
+from ipybd.function.name_cache import MemoryNameCache, NameCache, NameCheckpoint
+
+from ipybd.function.name_client import NameServerClient
+
+from ipybd.function.name_server import NameServer
+
+from ipybd.function.name_stats import NameStats
+
 from ipybd.function.cleaner import (AdminDiv, DateTime, FillNa,
                                     GeoCoordinate, HumanName, Number,
-                                    RadioInput, UniqueID, Url, ifunc)
+                                    RadioInput, UniqueID, Url, ifunc,
+                                    set_clean_cache)
 
 from ipybd.label.label_maker import Label
 
@@ -14,7 +14,11 @@ from prompt_toolkit.formatted_text import HTML
 from prompt_toolkit.shortcuts import prompt
 from tqdm import tqdm
 
-from ipybd.function.bioname import BioName
+from ipybd.function.bioname import ACTION_COLUMNS, BioName
+from ipybd.function.checklist import LocalChecklist
+from ipybd.function.name_cache import NameCache, NameCheckpoint
+from ipybd.function.name_stats import NameStats
+from ipybd.function.reference import ReferenceAttribute
 from ipybd.function.cleaner import (AdminDiv, DateTime, GeoCoordinate,
                                     HumanName, Number, RadioInput, UniqueID)
 
@@ -70,10 +74,28 @@ class ExpressionCompleter(Completer):
 
 
 class FormatDataset:
-    with open(STD_TERMS_ALIAS_PATH, encoding="utf-8") as std_alias:
-        std_field_alias = json.load(std_alias)
-
-    def __init__(self, *args, **kwargs):
+    std_field_alias = ReferenceAttribute(STD_TERMS_ALIAS_PATH)
+
+    def __init__(self, *args, name_store=None, name_checklist=None, name_workers=None,
+                 name_checkpoint=None, name_server=None, **kwargs):
+        # 学名检索结果的本地持久化缓存，可以是 NameCache 实例或 SQLite 文件路径
+        if isinstance(name_store, str):
+            name_store = NameCache(name_store)
+        self.name_store = name_store
+        # 代替 COL 在线接口的本地名录，可以是 LocalChecklist 实例或 SQLite 文件路径
+        if isinstance(name_checklist, str):
+            name_checklist = LocalChecklist(name_checklist)
+        self.name_checklist = name_checklist
+        # 解析大量学名时使用的进程数
+        self.name_workers = name_workers
+        # 学名批量检索任务的检查点，可以是 NameCheckpoint 实例或文件路径
+        if isinstance(name_checkpoint, str):
+            name_checkpoint = NameCheckpoint(name_checkpoint)
+        self.name_checkpoint = name_checkpoint
+        # 多个进程共用的学名检索服务地址，参见 NameServer
+        self.name_server = name_server
+        # 本实例中全部学名检索的运行统计，可以通过 to_dict、to_json 导出
+        self.name_stats = NameStats()
         self.df = self.read_data(*args, **kwargs)
         self.fields_manual_mapping = dict.fromkeys(self.df.columns)
         self.raw_columns = tuple(self.df.columns)
@@ -633,103 +655,134 @@ class FormatDataset:
         table = pd.concat(table, axis=0)
         return table
 
+    def _get_bioname(self, headers):
+        """ 获取由 headers 各列组成学名的 BioName 实例
+
+        同一组 headers 的 BioName 实例会被复用，以便共享其检索缓存
+        """
+        if getattr(self, 'name_cache', None) != headers:
+            self.name_cache = headers
+            if len(headers) > 1:
+                names = self.merge_columns(list(headers), " ")
+            else:
+                names = self.df[headers[0]]
+            self.bioname = BioName(
+                names, store=self.name_store, checklist=self.name_checklist,
+                workers=self.name_workers, checkpoint=self.name_checkpoint,
+                stats=self.name_stats, server=self.name_server)
+        return self.bioname
+
+    def _concat_name_results(self, results, concat, new_headers):
+        if concat and results:
+            new_columns = pd.DataFrame(results)
+            new_columns.columns = new_headers
+            self.df = pd.concat([self.df, new_columns], axis=1)
+        else:
+            return results
+
     def get_name(func):
         def get_func(self, *args, **kwargs):
             get_action, headers, concat, new_headers = func(
                 self, *args, **kwargs)
-            try:
-                if self.name_cache == headers:
-                    pass
-                else:
-                    self.name_cache = headers
-                    if len(headers) > 1:
-                        names = self.merge_columns(list(headers), " ")
-                    else:
-                        names = self.df[headers[0]]
-                    self.bioname = BioName(names)
-            except AttributeError:
-                self.name_cache = headers
-                if len(headers) > 1:
-                    names = self.merge_columns(list(headers), " ")
-                else:
-                    names = self.df[headers[0]]
-                self.bioname = BioName(names)
-            finally:
-                if isinstance(get_action, str) and get_action in ['simpleName', 'apiName', 'scientificName', 'plantSplitName', 'fullPlantSplitName', 'animalSplitName']:
-                    results = self.bioname.format_latin_names(get_action)
-                else:
-                    results = self.bioname.get(get_action)
-            if concat and results:
-                new_columns = pd.DataFrame(results)
-                new_columns.columns = new_headers
-                self.df = pd.concat([self.df, new_columns], axis=1)
+            bioname = self._get_bioname(headers)
+            if isinstance(get_action, str) and get_action in ['simpleName', 'apiName', 'scientificName', 'plantSplitName', 'fullPlantSplitName', 'animalSplitName']:
+                results = bioname.format_latin_names(get_action)
             else:
-                return results
+                results = bioname.get(get_action)
+            return self._concat_name_results(results, concat, new_headers)
         return get_func
 
+    async def aget_name(self, action, *headers, new_headers=None, concat=False, session=None):
+        """ 学名在线检索的协程版本
+
+        在调用者正在运行的事件循环中执行，可在 Jupyter 或异步服务中直接 await
+
+        action: BioName.get 支持的检索关键字，如 'stdName'、'colTaxonTree'
+        headers: 组成学名的各列列名
+        new_headers: concat 为 True 时新增列的列名，缺省时使用 action 对应的默认列名
+        session: 可选的 aiohttp.ClientSession
+        """
+        bioname = self._get_bioname(headers)
+        results = await bioname.aget(action, session=session)
+        return self._concat_name_results(
+            results, concat, new_headers or ACTION_COLUMNS[action])
+
+    def get_names(self, *headers, actions, concat=False):
+        """ 一次获取多种学名检索结果
+
+        headers: 组成学名的各列列名
+        actions: 由 BioName.get 支持的检索关键字组成的列表，如
+                 ['colName', 'colSynonyms', 'colTaxonTree']，来自同一平台的
+                 检索结果只会检索一次
+        concat: 为 True 时将结果写入 self.df，否则返回由结果组成的 DataFrame
+        """
+        bioname = self._get_bioname(headers)
+        results = bioname.get_many(actions)
+        results.index = self.df.index
+        if concat:
+            self.df = pd.concat([self.df, results], axis=1)
+        else:
+            return results
+
     @get_name
     def format_scientificname(self, *headers, pattern, new_headers=None, concat=False):
         return pattern, headers, concat, new_headers
 
     @get_name
-    def get_native_name(self, *headers, lib:'Series', new_header=('nativeName', 'nativeAuthor'), concat=False):
+    def get_native_name(self, *headers, lib:'Series | NativeNameIndex', new_header=('nativeName', 'nativeAuthor'), concat=False):
         return lib, headers, concat, new_header
 
     @get_name
     def name_spell_check(self, *headers, concat=False):
-        return 'stdName', headers, concat, ('nameSpellCheck', 'nameAuthors', 'mixFamily', 'mixCode')
+        return 'stdName', headers, concat, ACTION_COLUMNS['stdName']
 
     @get_name
     def get_tropicos_accepted(self, *headers, concat=False):
-        return 'tropicosAccepted', headers, concat, ('tropicosAccepted',)
+        return 'tropicosAccepted', headers, concat, ACTION_COLUMNS['tropicosAccepted']
 
     @get_name
     def get_tropicos_name(self, *headers, concat=False):
-        return 'tropicosName', headers, concat, ('tropicosName', 'tropicosAuthors',
-                                             'tropicosFamily', 'tropicosNameId')
+        return 'tropicosName', headers, concat, ACTION_COLUMNS['tropicosName']
+
     @get_name
     def get_ipni_name(self, *headers, concat=False):
-        return 'ipniName', headers, concat, ('ipniName', 'ipniAuthors',
-                                             'ipniFamily', 'ipniNameLsid')
+        return 'ipniName', headers, concat, ACTION_COLUMNS['ipniName']
 
     @get_name
     def get_ipni_reference(self, *headers, concat=False):
-        return 'ipniReference', headers, concat, ('publishingAuthor',
-            'publication', 'referenceCollation', 'publicationYear',
-            'publicationYearNote', 'referenceRemarks', 'citationReference',
-            'bhlLink', 'ipniPublicationLsid')
+        return 'ipniReference', headers, concat, ACTION_COLUMNS['ipniReference']
 
     @get_name
     def get_powo_name(self, *headers, concat=False):
-        return 'powoName', headers, concat, ('powoName', 'powoAuthors',
-                                             'powoFamily', 'ipniNameLsid')
+        return 'powoName', headers, concat, ACTION_COLUMNS['powoName']
 
     @get_name
     def get_powo_images(self, *headers, concat=False):
-        return 'powoImages', headers, concat, (
-            'powoImage1', 'powoImage2', 'powoImage3')
+        return 'powoImages', headers, concat, ACTION_COLUMNS['powoImages']
 
     @get_name
     def get_powo_accepted(self, *headers, concat=False):
-        return 'powoAccepted', headers, concat, ('powoAccepted',)
+        return 'powoAccepted', headers, concat, ACTION_COLUMNS['powoAccepted']
 
     @get_name
     def get_col_taxontree(self, *headers, concat=False):
-        return 'colTaxonTree', headers, concat, (
-            'colGenus', 'colFamily', 'colOrder', 'colClass', 'colPhylum', 'colKingdom')
+        return 'colTaxonTree', headers, concat, ACTION_COLUMNS['colTaxonTree']
+
+    @get_name
+    def get_col_classification(self, *headers, concat=False):
+        return 'colClassification', headers, concat, ACTION_COLUMNS['colClassification']
 
     @get_name
     def get_col_name(self, *headers, concat=False):
-        return 'colName', headers, concat, ('colName', 'colAuthors',
-                                            'colFamily', 'colCode')
+        return 'colName', headers, concat, ACTION_COLUMNS['colName']
 
     @get_name
     def get_col_synonyms(self, *headers, concat=False):
-        return 'colSynonyms', headers, concat, ('colSynonyms',)
+        return 'colSynonyms', headers, concat, ACTION_COLUMNS['colSynonyms']
 
     @get_name
     def get_col_accepted(self, *headers, concat=False):
-        return 'colSynonyms', headers, concat, ('colAccepted',)
+        return 'colSynonyms', headers, concat, ACTION_COLUMNS['colAccepted']
 
     def drop_and_concat_columns(func):
         def format_func(self, *args, **kwargs):
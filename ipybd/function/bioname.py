@@ -1,16 +1,32 @@
 
 import asyncio
+import os
+import pickle
 import re
+import time
 import unicodedata
 import urllib
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from typing import Union
 from ipybd.function.cleaner import ifunc
 
-import aiohttp
+import numpy as np
 import pandas as pd
-import requests
 from ipybd.function.api_terms import Filters
-from thefuzz import fuzz, process
+from ipybd.function.checklist import LocalChecklist
+from ipybd.function.name_cache import NameCache, NameCheckpoint
+from ipybd.function.name_client import NameServerClient, NameServerError
+from ipybd.function.name_stats import NameStats
+from ipybd.function.transport import get_transport
+from thefuzz import fuzz, process, utils
+try:
+    # thefuzz 0.20 之后基于 rapidfuzz 实现，可以直接使用其批量比对接口
+    from rapidfuzz import fuzz as rfuzz
+    from rapidfuzz import process as rprocess
+except ImportError:
+    rprocess = None
 from tqdm import tqdm
 
 
@@ -19,17 +35,441 @@ IPNI_API = 'http://beta.ipni.org/api/1'
 POWO_API = 'https://powo.science.kew.org/api/2'
 TROPICOS_API = 'https://services.tropicos.org/Name'
 
+# 各检索平台的接口地址，可以通过 BioName 的 apis 参数替换，
+# 以便指向镜像服务或者离线测试用的模拟服务
+DEFAULT_APIS = {
+    'col': SP2000_API,
+    'ipni': IPNI_API,
+    'powo': POWO_API,
+    'tropicos': TROPICOS_API
+}
+
+# 各 get 操作的检索结果所缓存的平台
+# stdName 除各平台的检索结果外，还记录各检索词最终选定结果的平台，
+# 只有选定的平台及其结果均已缓存时，才视为已经完成检索
+ACTION_PLATFORMS = {
+    'stdName': ('stdName', 'ipni', 'powo', 'tropicosName', 'col'),
+    'colTaxonTree': ('col',),
+    'colName': ('col',),
+    'colSynonyms': ('col',),
+    'colAccepted': ('col',),
+    'ipniName': ('ipni',),
+    'ipniReference': ('ipni',),
+    'powoName': ('powo',),
+    'powoAccepted': ('powo',),
+    'powoImages': ('powo',),
+    'tropicosName': ('tropicosName',),
+    'tropicosAccepted': ('tropicosAccepted',),
+    'tropicosSynonyms': ('tropicosSynonyms',)
+}
+
+# 持久化缓存中各缓存平台的检索结果所来自的检索平台
+STORE_SOURCES = {
+    'stdName': ('ipni', 'powo', 'tropicos', 'col'),
+    'ipni': ('ipni',),
+    'powo': ('powo',),
+    'col': ('col',),
+    'tropicosName': ('tropicos',),
+    'tropicosAccepted': ('tropicos',),
+    'tropicosSynonyms': ('tropicos',),
+    'colTaxa': ('col',),
+    'colClassification': ('col',)
+}
+
+# 各 get 操作的检索结果写入表格时默认使用的列名
+ACTION_COLUMNS = {
+    'stdName': ('nameSpellCheck', 'nameAuthors', 'mixFamily', 'mixCode'),
+    'colTaxonTree': ('colGenus', 'colFamily', 'colOrder', 'colClass', 'colPhylum', 'colKingdom'),
+    'colClassification': ('colGenus', 'colFamily', 'colOrder', 'colClass', 'colPhylum', 'colKingdom'),
+    'colName': ('colName', 'colAuthors', 'colFamily', 'colCode'),
+    'colSynonyms': ('colSynonyms',),
+    'colAccepted': ('colAccepted',),
+    'ipniName': ('ipniName', 'ipniAuthors', 'ipniFamily', 'ipniNameLsid'),
+    'ipniReference': ('publishingAuthor', 'publication', 'referenceCollation', 'publicationYear',
+                      'publicationYearNote', 'referenceRemarks', 'citationReference',
+                      'bhlLink', 'ipniPublicationLsid'),
+    'powoName': ('powoName', 'powoAuthors', 'powoFamily', 'ipniNameLsid'),
+    'powoAccepted': ('powoAccepted',),
+    'powoImages': ('powoImage1', 'powoImage2', 'powoImage3'),
+    'tropicosName': ('tropicosName', 'tropicosAuthors', 'tropicosFamily', 'tropicosNameId'),
+    'tropicosAccepted': ('tropicosAccepted',)
+}
+
+
+# 学名解析的缓存条目数
+NAME_CACHE_SIZE = 2 ** 20
+
+# 不重复的学名达到该数量时，才会启用多进程解析
+PARALLEL_THRESHOLD = 50000
+
+# IPNI、POWO 单个学名最多获取的检索结果数
+KEW_MAX_RESULTS = 500
+
+# 精简检索模式下 IPNI、POWO 首页的检索结果数，之后每页为前一页的 4 倍
+LEAN_PAGE_SIZE = 10
+
+# 属名 x 种名 种命名人 以及其后的种下部分
+SPECIES_PATTERN = re.compile(
+    r"((?:!×\s?|×\s?|!)?[A-Z][a-zàäçéèêëöôùûüîï-]+)\s*(×\s+|X\s+|x\s+|×)?([a-zàâäèéêëîïôœùûüÿç][a-zàâäèéêëîïôœùûüÿç-]+)?\s*(.*)")
+# 种下等级 种下加词 种下命名人
+SUBSPECIES_PATTERN = re.compile(
+    r"(^[\"\'A-Z\(\.].*?[^A-Z-\s]\s*(?=$|var\.|subvar\.|subsp\.|ssp\.|f\.|fo\.|subf\.|form\.|forma|nothosp\.|cv\.|cultivar\.))?(var\.|subvar\.|subsp\.|ssp\.|f\.|fo\.|subf\.|form\.|forma|nothosp\.|cv\.|cultivar\.)?\s*([a-zàäçéèêëöôùûüîï][a-zàäçéèêëöôùûüîï][a-zàäçéèêëöôùûüîï-]+)?\s*([\"\'（A-Z\(].*?[^A-Z-])?$")
+
+# 命名人中的标点及其前后的空白
+AUTHOR_PUNCTUATION = re.compile(r"\s*([\(\)\.,&;])\s*")
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def parse_name(raw_name):
+    """ 将手写学名拆分为各个组成部分，参见 BioName._format_name
+
+    同一学名的解析结果会被缓存，以便 build_querys、format_latin_names、
+    get_native_name 等方法重复使用
+
+    return: (genus, species, taxon_rank, infraspecies, authors, first_authors,
+             platform_rank, raw_name)，如果无法提取合法的学名，则返回 None
+    """
+    try:
+        species_split = SPECIES_PATTERN.findall(raw_name)[0]
+    except BaseException:
+        return None
+    subspec_split = SUBSPECIES_PATTERN.findall(species_split[3])[0]
+
+    genus = species_split[0]
+    if species_split[1] == "":
+        species = species_split[2]
+    else:
+        species = " ".join(['×', species_split[2]])
+    if subspec_split[2] == "":
+        authors = species_split[3]
+        taxon_rank = ""
+        infraspecies = ""
+        first_authors = ""
+        if species_split[2] != "":
+            platform_rank = Filters.specific
+        elif genus.lower().endswith((
+            "aceae", "idae", "umbelliferae", "labiatae", "compositae", "gramineae",
+                "leguminosae")):
+            platform_rank = Filters.familial
+        else:
+            platform_rank = Filters.generic
+    else:
+        infraspecies = subspec_split[2]
+        if infraspecies != species:
+            taxon_rank = subspec_split[1]
+            first_authors = subspec_split[0].strip()
+            authors = subspec_split[3].strip()
+            platform_rank = Filters.infraspecific
+        else:
+            # 原变种等种下加词和种加词一致的，种下和种命名人一致
+            # 这里将其作为种一级的名称进行处理
+            authors = subspec_split[0].strip()
+            if authors:
+                pass
+            else:
+                authors = subspec_split[3].strip()
+            taxon_rank = ""
+            first_authors = ""
+            infraspecies = ""
+            platform_rank = Filters.specific
+    return genus, species, taxon_rank, infraspecies, authors, first_authors, platform_rank, raw_name
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def canonical_authors(authors):
+    """ 命名人的规范化写法，仅用于判断两个命名人字符串是否等同
+
+    去除变音符号，统一标点前后的空白以及连续的空白
+    """
+    authors = unicodedata.normalize('NFD', authors).encode('ascii', 'ignore').decode('utf-8')
+    authors = AUTHOR_PUNCTUATION.sub(r'\1 ', authors)
+    return ' '.join(authors.split())
+
+
+# 命名人字符串中的各个命名人
+AUTHOR_TEAM_PATTERN = re.compile(
+    r"(?:^|\(\s*|\s+et\s+|\s+ex\s+|\&\s*|\,\s*|\)\s*|\s+and\s+|\[\s*|\（\s*|\）\s*|\，\s*|\{\s*|\}\s*)([^\s\&\(\)\,\;\.\-\?\，\（\）\[\]\{\}][^\&\(\)\,\;\，\（\）\[\]\{\}]+?(?=\s+ex\s+|\s+et\s+|\s*\&|\s*\,|\s*\)|\s*\(|\s+and\s+|\s+in\s+|\s*\）|\s*\（|\s*\，|\s*\;|\s*\]|\s*\[|\s*\}|\s*\{|\s*$))")
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def parse_author_team(authors):
+    """ 提取学名命名人中，各个命名人的名字，参见 BioName.get_author_team
+
+    同一命名人字符串只会被解析一次
+
+    return: 由命名人组成的元组
+    """
+    if authors.startswith('（'):
+        authors = authors.replace('（', '(')
+        authors = authors.replace('）', ')')
+    if authors.startswith('('):
+        if authors.find(')') < authors.find(' ex '):
+            # authors 等于 ) 前的字符串加上 ex 后的字符串
+            authors = authors[:authors.find(')')+1] + authors[authors.find(' ex ')+3:]
+        if 'in ' in authors and authors.find(')') > authors.find(' in '):
+            # authors 等于 in 之前的字符串加上 ) 后的字符串
+            authors = authors[:authors.find(' in ')] + authors[authors.find(')'):]
+    # 排除 authors 中 ex 前的命名人
+    authors = authors.split(' ex ')[1].strip() if ' ex ' in authors else authors
+    # 排除 authors 中 in 后的命名人
+    authors = authors.split(' in ')[0].strip() if ' in ' in authors else authors
+    try:
+        authors = ascii_authors(authors)
+    # authors 为空
+    except AttributeError:
+        return ()
+    # 命名人可能是有一至多个部分组成，这里通过四种模式猜测可能的名称组成形式
+    author_team = AUTHOR_TEAM_PATTERN.findall(authors)
+    author_team = check_author_team(author_team)
+    return tuple(author_team)
+
+
+def check_author_team(author_team):
+    # 判断 author_team 中是否存在全部是小写字母组成的元素
+    # 比如 comb. nov. cons. stat.，这些标识可能会被误认为是命名人
+    # 如果存在，就删除这个元素
+    for author in author_team.copy():
+        if author.islower():
+            # 一些命名人可能存在自指的情况
+            # 比如 Ania elmeri (Ames & sine ref.) A.D.Hawkes
+            # sine ref. 虽然是小写字母，但它应该作为 Ames 的一部分
+            # 程序这里没有对这种情况做处理，以后可以考虑加入
+            author_team.remove(author)
+    return author_team
+
+
+def strip_accents(text):
+    """尽最大可能将字符串中衍生的拉丁字母转换为英文字母
+
+    Args:
+        text (str): 需要处理的字符串，比如 'PančićDiklić & V.NikolićØ的'
+
+    Returns:
+        str: 转换后的字符串，注意 text 中某些字符，可能由于无法转换为英文字母而被删除
+    """
+    # 统一一些组合字符的不同写法，以使其等价，比如 é 和 e\u0301
+    # 这里 normalize 的模式必须设置为 NFD 而非 NFC，否则后续decode
+    # 方法将无法给一些非 ascii 字符分配一个合适的 ascii 字符
+    text = unicodedata.normalize('NFD', text)
+    # 将命名人中的不同字符尽可能转化为 a-ZA-Z
+    # 比如 PančićDiklić & V.Nikolić 转换为 PancicDiklic & V.Nikolic
+    # 注意：字符串中的一些特殊字符可能无法转换，比如字符 Ø， 这些字符将被从字符串中删除
+    ascii_text = text.encode('ascii', 'ignore').decode('utf-8')
+    return ascii_text
+
+
+def ascii_authors(authors, discard=True):
+    # strip_accents 并不能将所有字符转换为 ascii
+    # 这些字符在返回的结果中会被删除
+    pinyin = {'ß': 'ss', 'æ': 'ae', 'Ø': 'O', 'ø': 'o', 'þ': 'th', 'ð': 'd',
+              'Ɖ': 'D', 'ł': 'l', 'đ': 'd', 'ı': 'i', 'Р': 'R', 'Т': 'T'}
+    # 先尽可能的将特殊文本转换为大小写英文字母
+    authors = authors.translate(str.maketrans(pinyin))
+    if discard:
+        # 然后再进行字符转换，其中有些字母可能仍然无法转换
+        ascii_authors = strip_accents(authors)
+    else:
+        # 如果仍然存在无法转换为英文的字母，则在 authors 中予以保留该字符
+        chars = [strip_accents(word) if strip_accents(
+            word) else word for word in authors]
+        ascii_authors = ''.join(chars)
+        #print(f'\n 命名人中存在特殊字符，程序目前无法识别 {ascii_authors} \n')
+    return ascii_authors
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def clean_author(author):
+    """ 去除命名人缩写中的标点，用于命名人比对
+    """
+    aut = author.replace(".", " ")
+    aut = aut.replace("-", " ")
+    aut = aut.replace("'", " ")
+    aut = aut.replace("  ", " ")
+    return aut.strip()
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def _processed_author(author):
+    # 与 thefuzz 比对前对字符串的预处理一致
+    return utils.full_process(author, force_ascii=True)
+
+
+def score_author_teams(raw_team, std_teams):
+    """ 一次性比较一个命名人组合与多个候选命名人组合的相似度
+
+    结果与 BioName.contrast_authors 逐一调用 process.extract 的结果一致，
+    但全部命名人只计算一次相似度矩阵
+
+    raw_team: 经 clean_author 处理的命名人列表，不可以为 []
+    std_teams: 经 clean_author 处理的候选命名人列表组成的列表
+
+    return: 由 (平均得分, 候选序号) 组成的列表
+    """
+    choices = list(dict.fromkeys(author for std_team in std_teams for author in std_team))
+    if choices:
+        matrix = rprocess.cdist(
+            [_processed_author(author) for author in raw_team],
+            [_processed_author(author) for author in choices],
+            scorer=rfuzz.token_sort_ratio,
+            dtype=np.float64
+        )
+        columns = {author: i for i, author in enumerate(choices)}
+    s_teams_score = []
+    for n, std_team in enumerate(std_teams):
+        indexes = [columns[author] for author in std_team]
+        score = []
+        for i, r_author in enumerate(raw_team):
+            if not indexes:
+                # 有些参与比对的学名，命名人可能为 []
+                score.append(0)
+                continue
+            ratios = matrix[i, indexes]
+            # 得分相同时，与 process.extract 一样选取排序靠前的命名人
+            best = int(ratios.argmax())
+            # 命名人的姓的首字母，必须要在比对的名称之中，参见 contrast_authors
+            if r_author.split()[-1][0] in std_team[best]:
+                score.append(int(round(float(ratios[best]))))
+            else:
+                score.append(0)
+        s_teams_score.append((sum(score)/len(score), n))
+    return s_teams_score
+
+
+def parse_unique_names(names, workers=None, threshold=PARALLEL_THRESHOLD):
+    """ 解析一组互不重复的学名
+
+    names: 互不重复的学名组成的列表
+    workers: 进程数，大于 1 且学名数量不少于 threshold 时，由多个进程分片解析
+    threshold: 启用多进程解析的最少学名数量，学名较少时多进程的开销反而更大
+
+    return: 与 names 一一对应的解析结果列表
+    """
+    if workers and workers > 1 and len(names) >= threshold:
+        size = max(1, -(-len(names) // (workers * 4)))
+        chunks = [names[i:i+size] for i in range(0, len(names), size)]
+        parsed = []
+        with ProcessPoolExecutor(workers) as pool:
+            for chunk, results in zip(chunks, pool.map(_parse_chunk, chunks)):
+                parsed.extend(
+                    result and result[:6] + (Filters[result[6]], raw_name)
+                    for raw_name, result in zip(chunk, results)
+                )
+        return parsed
+    return [parse_name(name) for name in names]
+
+
+def _parse_chunk(names):
+    # Filters 成员按其 dict 值序列化，进程间改为传递成员名称以减少开销，
+    # 原始学名也无需回传
+    return [
+        result and result[:6] + (result[6].name,)
+        for result in map(parse_name, names)
+    ]
+
+
+def parse_names(names, workers=None, threshold=PARALLEL_THRESHOLD):
+    """ 批量解析学名
+
+    names: 学名组成的可迭代对象
+    workers: 进程数，参见 parse_unique_names
+    threshold: 启用多进程解析的最少学名数量
+
+    return: 与 names 一一对应的 DataFrame，各列分别为 genus、species、rank、
+            infraspecies、authors、first_authors、filters（Filters 类型的检索
+            阶元），无法解析的学名各列均为 None
+    """
+    names = pd.Series(names, dtype=object)
+    # 缺失值的序号为 -1，不参与解析
+    codes, uniques = pd.factorize(names)
+    parsed = parse_unique_names(list(uniques), workers, threshold)
+    blank = (None,) * 7
+    rows = [parsed[code] or blank if code >= 0 else blank for code in codes]
+    return pd.DataFrame(
+        [row[:7] for row in rows],
+        index=names.index,
+        columns=['genus', 'species', 'rank', 'infraspecies', 'authors', 'first_authors', 'filters'],
+        dtype=object
+    )
+
 
 @ifunc
 class BioName:
-    def __init__(self, names: Union[list, pd.Series, tuple], style='scientificName'):
+    def __init__(self, names: Union[list, pd.Series, tuple], style='scientificName', store=None,
+                 transport=None, cascade='sequential', hedge_delay=2.0, checklist=None,
+                 workers=None, parallel_threshold=PARALLEL_THRESHOLD, checkpoint=None, chunksize=5000,
+                 stats=None, apis=None, server=None, lean=False):
+        """
+        names: 学名组成的可迭代对象
+        style: 直接调用实例时，返回的学名样式
+        store: 可选的本地持久化缓存，可以是 NameCache 实例，也可以是
+               SQLite 文件路径，设置后检索结果可以跨进程、跨会话复用
+        transport: 可选的 Transport 实例，缺省时使用进程内共享的传输层
+        cascade: stdName 依次检索 ipni、powo、tropicos、col 的方式，
+                 'sequential' 逐一检索，前一平台查无结果后再检索下一平台；
+                 'parallel' 同时检索全部平台；'hedged' 前一平台超过 hedge_delay
+                 秒仍未返回时，提前检索下一平台。各方式均按上述优先级选取结果
+        hedge_delay: 'hedged' 方式下提前检索下一平台前等待的秒数
+        checklist: 可选的本地名录，可以是 LocalChecklist 实例，也可以是其
+                   SQLite 文件路径，设置后 COL 相关的检索均由本地名录完成
+        workers: 解析学名的进程数，缺省时在当前进程中解析
+        parallel_threshold: 不重复的学名达到该数量时，才会启用多进程解析
+        checkpoint: 可选的检查点文件路径或 NameCheckpoint 实例，设置后 WEB 检索
+                    按 chunksize 分批进行，每完成一批即写入检查点，中断后重新
+                    执行时，检查点中已有结果的检索词不再检索
+        chunksize: 设置检查点时每批检索的检索词数量
+        stats: 可选的 NameStats 实例，用于汇总多个 BioName 的运行统计，
+               缺省时新建一个，可以通过 self.stats 获取
+        apis: 可选的 平台:接口地址 组成的字典，用于替换 DEFAULT_APIS 中
+              col、ipni、powo、tropicos 的接口地址
+        server: 可选的 NameServer 服务地址或 NameServerClient 实例，设置后需要联网
+                检索的学名都提交给该服务检索，以便同一台机器上的多个进程共用其
+                检索缓存和上游服务的连接池；服务无法连接时，改为直接检索
+        lean: 是否以精简模式检索 IPNI、POWO，精简模式下先获取少量检索结果，
+              已经找到同名且命名人完全匹配的学名时不再获取后续结果，只保留同名
+              的检索结果；结果与完整检索相同，但查无完全匹配的学名时请求数更多
+        """
+        if cascade not in ('sequential', 'parallel', 'hedged'):
+            raise ValueError("cascade must be 'sequential', 'parallel' or 'hedged'")
         self.names = names
         self.querys = {}
         self.cache = {'ipni': {}, 'col': {}, 'powo': {}, 'tropicosName': {
-        }, 'tropicosAccepted': {}, 'tropicosSynonyms': {}}
+        }, 'tropicosAccepted': {}, 'tropicosSynonyms': {}, 'stdName': {}}
+        # 属、科一级的 COL 分类阶元缓存，key 为 (阶元, 名称)，
+        # 值为 col_taxontree 样式的元组，查无结果时为 None
+        self.taxa = {}
         self.style = style
+        if isinstance(store, str):
+            store = NameCache(store)
+        self.store = store
+        self.transport = transport or get_transport()
+        self.cascade = cascade
+        self.hedge_delay = hedge_delay
+        if isinstance(checklist, str):
+            checklist = LocalChecklist(checklist)
+        self.checklist = checklist
+        self.workers = workers
+        self.parallel_threshold = parallel_threshold
+        if isinstance(checkpoint, str):
+            checkpoint = NameCheckpoint(checkpoint)
+        self.checkpoint = checkpoint
+        self.chunksize = chunksize
+        self.stats = stats if stats is not None else NameStats()
+        self.apis = dict(DEFAULT_APIS)
+        if apis:
+            unknown = set(apis) - set(DEFAULT_APIS)
+            if unknown:
+                raise ValueError("unknown platforms in apis: {}".format(', '.join(sorted(unknown))))
+            self.apis.update({platform: api.rstrip('/') for platform, api in apis.items()})
+        if isinstance(server, str):
+            server = NameServerClient(server)
+        self.server = server
+        self.lean = lean
+        # 每个检索词完成 WEB 检索（包括请求失败）后调用，参数为该检索词的检索条件，
+        # 供 NameServer 逐个通知等待同一检索词的其他请求
+        self.on_resolved = None
 
     def get(self, action, typ=list, mark=False):
+        start = time.monotonic()
         if self.querys == {}:
             self.querys = self.build_querys()
         if isinstance(action, str):
@@ -37,6 +477,102 @@ class BioName:
             results = self.__build_cache_and_get_results(action)
         else:
             results = self.native_get(self.querys, action)
+        self._record_action(action, start)
+        return self._pack_results(results, typ, mark)
+
+    async def aget(self, action, typ=list, mark=False, session=None):
+        """ get 的协程版本
+
+        在调用者正在运行的事件循环中执行，可以在 Jupyter 或者其他异步服务中
+        直接 await，无需新建事件循环；同一个 BioName 实例同一时间只应执行一个
+        aget，并发处理多批学名时应分别创建实例，它们会共享同一个传输层。
+
+        session: 可选的 aiohttp.ClientSession，缺省时使用传输层共享的连接池
+        """
+        start = time.monotonic()
+        if self.querys == {}:
+            self.querys = self.build_querys()
+        if isinstance(action, str):
+            results = await self._abuild_cache_and_get_results(action, session)
+        else:
+            results = self.native_get(self.querys, action)
+        self._record_action(action, start)
+        return self._pack_results(results, typ, mark)
+
+    def get_many(self, actions, mark=False):
+        """ 一次获取多种检索结果
+
+        检索结果来自同一平台的 action（如 colName、colSynonyms、colTaxonTree）
+        只会检索一次该平台，之后在一次遍历中提取全部 action 所需的数据
+
+        actions: 由 get 支持的检索关键字组成的列表
+        mark: 同 get
+
+        return: 与 self.names 一一对应的 DataFrame，列名为各 action 在
+                ACTION_COLUMNS 中对应的列名，同名的列只保留首次出现的列
+        """
+        if self.querys == {}:
+            self.querys = self.build_querys()
+        fetched = set()
+        for action in actions:
+            platforms = ACTION_PLATFORMS.get(action, (action,))
+            if platforms not in fetched:
+                fetched.add(platforms)
+                self._fetch(action)
+        results = {action: {} for action in actions}
+        extractors = [
+            (results[action], self._action_cache(action), self._action_func(action))
+            for action in actions if action != 'colClassification'
+        ]
+        for raw_name, query in self.querys.items():
+            if not query:
+                continue
+            for action_results, cache, action_func in extractors:
+                try:
+                    action_results[raw_name] = self.get_cache_result(cache[raw_name], action_func)
+                except (KeyError, ValueError):
+                    pass
+        if 'colClassification' in results:
+            results['colClassification'] = self._get_classification_results()[0]
+        frames = []
+        for action in actions:
+            columns = list(ACTION_COLUMNS[action])
+            found = set(results[action])
+            rows = self._pack_results(results[action], list, mark)
+            if not rows:
+                frame = pd.DataFrame(None, index=range(len(self.names)), columns=columns, dtype=object)
+            elif action == 'colSynonyms':
+                # 异名的个数不定，以列表的形式写入同一列；rows 的宽度取决于首个
+                # 结果的异名个数，可能为 0，因此未获得结果的行不能按宽度取值
+                frame = pd.DataFrame({columns[0]: [
+                    list(results[action][name]) if name in found else (row[0] if row else None)
+                    for name, row in zip(self.names, rows)
+                ]}, dtype=object)
+            else:
+                frame = pd.DataFrame(rows, columns=columns, dtype=object)
+            frames.append(frame)
+        results = pd.concat(frames, axis=1)
+        # 不同 action 的同名列（如 colName 与 colTaxonTree 的 colFamily）只保留首次出现的列
+        return results.loc[:, ~results.columns.duplicated()]
+
+    def _fetch(self, action):
+        """ 检索缓存中尚不存在的检索词，检索结果写入缓存
+        """
+        if action == 'colClassification':
+            self._build_classification()
+            return
+        # 按 action 自身的缓存判断是否已经完成检索，stdName 不会因其他 action
+        # 已经写入某一平台的结果而跳过检索，结果与各 action 的顺序无关
+        cache = self._action_cache(action)
+        search_terms = {
+            raw_name: query for raw_name, query in self.querys.items()
+            if query and raw_name not in cache
+        }
+        self._record_memory_hits(action, search_terms)
+        if search_terms:
+            self._web_get_terms(action, search_terms)
+
+    def _pack_results(self, results, typ, mark):
         if results:
             if typ is list:
                 return self._results2list(results, mark)
@@ -84,62 +620,257 @@ class BioName:
     # 以下多个方法用于组装 get 协程
     # 跟踪协程的执行，并将执行结果生成缓存
 
-    def __build_cache_and_get_results(self, action, leftover_querys=None):
+    def __build_cache_and_get_results(self, action):
         """ 构建查询缓存、返回查询结果
 
         action: 要进行的查询操作描述字符串
-        need_querys: 没有缓存，需要进行 WEB 查询的检索词
-                     由 self.querys 部分元素组成解字典
 
          返回检索结果字典 results，字典由原始检索词:检索结果组成
                若没有任何结果，返回 {}
                检索过程中，会一并生成 self.names 在相应平台的检索返回内容缓存
         """
-        cache_mapping = {
-            'stdName': {
-                **self.cache['ipni'],
-                **self.cache['powo'],
-                **self.cache['tropicosName'],
-                **self.cache['col'],
-                },
-            'colTaxonTree': self.cache['col'],
-            'colName': self.cache['col'],
-            'colSynonyms': self.cache['col'],
-            'colAccepted': self.cache['col'],
-            'ipniName': self.cache['ipni'],
-            'ipniReference': self.cache['ipni'],
-            'powoName': self.cache['powo'],
-            'powoAccepted': self.cache['powo'],
-            'powoImages': self.cache['powo'],
-            'tropicosName': self.cache['tropicosName'],
-            'tropicosAccepted': self.cache['tropicosAccepted'],
-            'tropicosSynonyms': self.cache['tropicosSynonyms']
+        if action == 'colClassification':
+            return self._build_classification()
+        results, search_terms = self._get_cache_results(action)
+        self._record_memory_hits(action, search_terms)
+        if search_terms:
+            self._web_get_terms(action, search_terms)
+            # 对 web 检索过的检索词再从缓存中提取一次结果
+            sub_results, _ = self._get_cache_results(action, search_terms)
+            results.update(sub_results)
+        return results
+
+    async def _abuild_cache_and_get_results(self, action, session=None):
+        """ __build_cache_and_get_results 的协程版本
+        """
+        if action == 'colClassification':
+            return await self._abuild_classification(session)
+        results, search_terms = self._get_cache_results(action)
+        self._record_memory_hits(action, search_terms)
+        if search_terms:
+            for chunk in self._web_chunks(action, search_terms):
+                await self.async_web_get(action, chunk, session)
+                self._save_chunk(action, chunk)
+            sub_results, _ = self._get_cache_results(action, search_terms)
+            results.update(sub_results)
+        return results
+
+    def _build_classification(self):
+        """ 按照学名所属的属（科一级的学名按科）获取 COL 分类阶元
+
+        每个属只检索一次，已经检索过的属和科，包括其他 COL 检索结果中
+        包含的属和科，不再重复检索
+
+        return: 由原始检索词:col_taxontree 样式的元组组成的字典
+        """
+        results, taxa = self._get_classification_results()
+        if taxa:
+            web_taxa = self._load_taxa(taxa)
+            self.stats.record_cache(
+                'colClassification', store=len(taxa) - len(web_taxa), web=len(web_taxa))
+            if web_taxa:
+                self.transport.run(self.async_taxa_get(web_taxa))
+                self._save_taxa(web_taxa)
+            results, _ = self._get_classification_results()
+        return results
+
+    async def _abuild_classification(self, session=None):
+        """ _build_classification 的协程版本
+        """
+        results, taxa = self._get_classification_results()
+        if taxa:
+            web_taxa = self._load_taxa(taxa)
+            self.stats.record_cache(
+                'colClassification', store=len(taxa) - len(web_taxa), web=len(web_taxa))
+            if web_taxa:
+                await self.async_taxa_get(web_taxa, session)
+                self._save_taxa(web_taxa)
+            results, _ = self._get_classification_results()
+        return results
+
+    def _get_classification_results(self):
+        """ 从属、科分类阶元缓存中提取各学名的分类阶元
+
+        return: (results, taxa)，taxa 为缓存中不存在、需要检索的属和科
+        """
+        self._collect_taxa()
+        results = {}
+        taxa = set()
+        for raw_name, query in self.querys.items():
+            key = self._taxon_key(query)
+            if key is None:
+                continue
+            elif key in self.taxa:
+                if self.taxa[key]:
+                    results[raw_name] = self.taxa[key]
+            else:
+                taxa.add(key)
+        return results, taxa
+
+    def _taxon_key(self, query):
+        """ 由检索条件获取学名所属的属，科一级的学名返回科本身
+
+        return: (阶元, 名称)，无法获取时返回 None
+        """
+        if not query:
+            return None
+        if query[1] is Filters.familial:
+            return 'family', query[0]
+        genus = query[0].split()[0].lstrip('!×').strip()
+        return ('genus', genus) if genus else None
+
+    def _collect_taxa(self):
+        """ 从已有的 COL 检索结果中收集属和科的分类阶元
+        """
+        for result in self.cache['col'].values():
+            try:
+                tree = self.col_taxontree(result)
+            except (KeyError, TypeError):
+                continue
+            self._add_taxon(tree)
+
+    def _add_taxon(self, tree):
+        if tree[0] and not self.taxa.get(('genus', tree[0])):
+            self.taxa[('genus', tree[0])] = tree
+        if tree[1] and not self.taxa.get(('family', tree[1])):
+            self.taxa[('family', tree[1])] = (None,) + tuple(tree[1:])
+
+    def _load_taxa(self, taxa):
+        """ 从本地持久化缓存中读取属、科的分类阶元
+
+        return: 本地缓存中不存在的属和科
+        """
+        if self.store is None:
+            return taxa
+        keys = {'|'.join(key): key for key in taxa}
+        for store_key, tree in self.store.get(self._store_name('colTaxa'), keys).items():
+            self.taxa[keys[store_key]] = tuple(tree) if tree else None
+        failed = self.store.failed(self._store_name('colClassification'), keys)
+        return {key for store_key, key in keys.items() if key not in self.taxa and store_key not in failed}
+
+    def _save_taxa(self, taxa):
+        if self.store is None:
+            return
+        self.store.set(self._store_name('colTaxa'), {
+            '|'.join(key): self.taxa[key] for key in taxa if key in self.taxa})
+        self.store.set_failed(
+            self._store_name('colClassification'),
+            ['|'.join(key) for key in taxa if key not in self.taxa])
+
+    async def async_taxa_get(self, taxa, session=None):
+        """ 检索 COL 获得属、科的分类阶元，结果直接写入 self.taxa
+
+        taxa: 由 (阶元, 名称) 组成的集合
+        """
+        if self.server is not None:
+            try:
+                self.taxa.update(await self.server.taxa(taxa))
+                return
+            except NameServerError as e:
+                print("\n学名检索服务连接失败，改为直接检索：{}".format(e))
+                self.server = None
+        self.pbar = tqdm(total=len(taxa), desc='colClassification', ascii=True)
+        await asyncio.gather(*[self.get_col_taxon(key, session) for key in taxa])
+        self.pbar.close()
+
+    async def get_col_taxon(self, key, session):
+        rank, name = key
+        filters = Filters.familial if rank == 'family' else Filters.generic
+        result = await self.check_col_name((name, filters, '', name), session)
+        self.pbar.update(1)
+        if result is None:
+            self.taxa[key] = None
+        elif result:
+            tree = self.col_taxontree(result)
+            self.taxa[key] = tree
+            self._add_taxon(tree)
+        # 网络请求失败时不写入缓存
+
+    def _web_get_terms(self, action, search_terms):
+        """ 依次从本地缓存、检查点和 WEB 获取 search_terms 的检索结果
+        """
+        for chunk in self._web_chunks(action, search_terms):
+            self.web_get(action, chunk)
+            self._save_chunk(action, chunk)
+
+    def _web_chunks(self, action, search_terms):
+        """ 将需要 WEB 检索的检索词分批
+
+        本地缓存和检查点中已有结果的检索词不再检索；未设置检查点时只分为一批
+
+        return: 由 search_terms 部分元素组成的字典的生成器
+        """
+        web_terms = self.load_store(action, search_terms)
+        stored = self._cached_count(action, search_terms) if self.store is not None else 0
+        if self.checkpoint is None:
+            self.stats.record_cache(action, store=stored, web=len(web_terms))
+            if web_terms:
+                yield web_terms
+            return
+        web_terms = self.load_store(action, web_terms, self.checkpoint)
+        self.stats.record_cache(
+            action, store=stored, checkpoint=self._cached_count(action, search_terms) - stored,
+            web=len(web_terms))
+        raw_names = list(web_terms)
+        self._job = {
+            'chunks': -(-len(raw_names) // self.chunksize),
+            'total': len(raw_names),
+            'done': 0,
+            # 各批请求失败的检索词数之和，self.failures 只记录当前一批
+            'failed': 0,
+            'start': time.time()
         }
+        for i in range(0, len(raw_names), self.chunksize):
+            yield {raw_name: web_terms[raw_name] for raw_name in raw_names[i:i+self.chunksize]}
+
+    def _cached_count(self, action, search_terms):
+        cache = self._action_cache(action)
+        return sum(1 for raw_name in search_terms if raw_name in cache)
+
+    def _record_memory_hits(self, action, search_terms):
+        """ 记录内存缓存中已有结果、无需再检索的检索词数
+        """
+        valid = sum(1 for query in self.querys.values() if query)
+        self.stats.record_cache(
+            action, memory=valid - sum(1 for query in search_terms.values() if query))
+
+    def _record_action(self, action, start):
+        if not isinstance(action, str):
+            action = 'nativeName'
+        self.stats.record_action(action, len(self.querys), time.monotonic() - start)
+
+    def _save_chunk(self, action, chunk):
+        """ 保存一批 WEB 检索的结果，设置检查点时报告任务进度
+        """
+        self.save_store(action, chunk)
+        if self.checkpoint is None:
+            return
+        self.save_store(action, chunk, self.checkpoint)
+        job = self._job
+        job['done'] += len(chunk)
+        job['failed'] += len(self.failures)
+        print("\n{0}: 已完成 {1}/{2} 批，{3}/{4} 个检索词，失败 {5} 个，用时 {6:.0f} 秒".format(
+            action, -(-job['done'] // self.chunksize), job['chunks'], job['done'],
+            job['total'], job['failed'], time.time() - job['start']))
+
+    def _get_cache_results(self, action, leftover_querys=None):
+        """ 从缓存中提取查询结果
+
+        action: 要进行的查询操作描述字符串
+        leftover_querys: 已经执行过 web 查询的检索词，由 self.querys 部分元素组成的字典，
+                         为 None 时从 self.querys 中提取结果
+
+        return: (results, search_terms)，results 由原始检索词:检索结果组成，
+                search_terms 为缓存中不存在、需要进行 web 查询的检索词
+        """
         results = {}
-        cache = cache_mapping[action]
+        cache = self._action_cache(action)
         if cache:
             if leftover_querys:
                 names = leftover_querys
             else:
                 names = self.querys
-            action_func = {
-                # 注意 stdName 的 col 函数置于元组最后，
-                # 以避免 ipni/powo 中与 col 同名的字段
-                # 被 col 函数解析。
-                'stdName': (self.ipni_name, self.powo_name, self.tropicos_name, self.col_name),
-                'colTaxonTree': self.col_taxontree,
-                'colName': self.col_name,
-                'colSynonyms': self.col_synonyms,
-                'colAccepted': self.col_accepted,
-                'ipniName': self.ipni_name,
-                'ipniReference': self.ipni_reference,
-                'powoName': self.powo_name,
-                'powoAccepted': self.powo_accepted,
-                'powoImages': self.powo_images,
-                'tropicosName': self.tropicos_name,
-                'tropicosAccepted': self.tropicos_accepted,
-                # 'tropicosSynonyms': self.tropicos_synonyms
-            }
+            action_func = self._action_func(action)
             # 如果存在缓存，则直接从缓存数据中提取结果
             # 如果没有缓存，则先生成缓存，再取数据
             search_terms = {}
@@ -147,7 +878,7 @@ class BioName:
                 try:
                     results[org_name] = self.get_cache_result(
                         cache[org_name],
-                        action_func[action]
+                        action_func
                     )
                 except KeyError:
                     # 缓存中不存在 org_name 检索结果时触发
@@ -159,20 +890,127 @@ class BioName:
                     # 则不写入 results
                     pass
         else:
-            if not leftover_querys:
-                # 如果没有缓存，所有检索词执行一次 web 搜索
-                search_terms = self.querys
-        # 为防止 search_terms 不存在，这里的条件判断应放置在后面
-        if not leftover_querys and search_terms:
-            # 若leftover_querys 是 None, 说明 web 请求是首次发起，执行一次递归检索
-            # 若search_terms 并非 self.querys，说明 get 请求是由程序本身自动发起
-            # 执行结束后，将不再继续执行递归
-            self.web_get(action, search_terms)
-            # 这里的递归最多只执行一次
-            sub_results = self.__build_cache_and_get_results(
-                action, search_terms)
-            results.update(sub_results)
-        return results
+            # 如果没有缓存，所有检索词执行一次 web 搜索
+            search_terms = self.querys
+        if leftover_querys:
+            # 已经执行过 web 查询的检索词不再重复查询
+            search_terms = {}
+        return results, search_terms
+
+    def load_store(self, action, search_terms, store=None):
+        """ 从本地持久化缓存中读取检索结果并写入 self.cache
+
+        store: 读取的缓存，缺省时为 self.store
+
+        return: 本地缓存中不存在的检索词，由 search_terms 部分元素组成的字典
+        """
+        if store is None:
+            store = self.store
+        if store is None:
+            return search_terms
+        keys = {
+            raw_name: self._cache_key(query)
+            for raw_name, query in search_terms.items() if query
+        }
+        for platform in ACTION_PLATFORMS[action]:
+            stored = store.get(self._store_name(platform), keys.values())
+            for raw_name, key in keys.items():
+                if key in stored:
+                    self.cache[platform][raw_name] = stored[key]
+        # 近期请求失败过的检索词暂不重复请求，但也不视为查无结果
+        failed = store.failed(self._store_name(action), keys.values())
+        # 某一平台有缓存并不代表 action 已经完成检索，如 colName 缓存的 COL
+        # 结果不能代替 stdName 对各平台的依次检索
+        cache = self._action_cache(action)
+        return {
+            raw_name: query for raw_name, query in search_terms.items()
+            if raw_name not in cache and keys.get(raw_name) not in failed
+        }
+
+    def save_store(self, action, search_terms, store=None):
+        """ 将 WEB 检索的结果写入本地持久化缓存
+
+        检索成功和查无结果（结果为 None）的检索词写入各平台的缓存，
+        请求失败的检索词则单独记录，以便稍后重新检索
+
+        store: 写入的缓存，缺省时为 self.store
+        """
+        if store is None:
+            store = self.store
+        if store is None:
+            return
+        for platform in ACTION_PLATFORMS[action]:
+            items = {
+                self._cache_key(query): self.cache[platform][raw_name]
+                for raw_name, query in search_terms.items()
+                if query and raw_name in self.cache[platform]
+            }
+            store.set(self._store_name(platform), items)
+        store.set_failed(
+            self._store_name(action),
+            [self._cache_key(self.querys[raw_name]) for raw_name in self.failures]
+        )
+
+    def _cache_key(self, query):
+        """ 由 build_querys 生成的检索条件构建规范化的检索词
+
+        仅空白、变音符号或命名人标点写法不同的检索词，如 "Abies fabri (Mast.)Craib"
+        与 "Abies  fabri (Mast.) Craib"，会得到相同的结果，用于 WEB 检索去重和
+        持久化缓存的 key
+        """
+        return '|'.join([query[0], query[1].name, canonical_authors(query[2])])
+
+    def _store_name(self, name):
+        """ 获取 self.cache 的平台或者检索关键字在持久化缓存中使用的名称
+
+        使用本地名录或者替换了接口地址的检索平台，其检索结果与缺省接口的结果
+        分开缓存，名称后依次附加各检索来源，如 "ipni@ipni=http://127.0.0.1:8001/ipni"、
+        "col@col=checklist:/data/checklist.sqlite"
+        """
+        if name in STORE_SOURCES:
+            platforms = STORE_SOURCES[name]
+        else:
+            platforms = sorted({
+                source for platform in ACTION_PLATFORMS[name] for source in STORE_SOURCES[platform]})
+        sources = []
+        for platform in platforms:
+            if platform == 'col' and self.checklist is not None:
+                sources.append('col=checklist:' + os.path.abspath(self.checklist.path))
+            elif self.apis[platform] != DEFAULT_APIS[platform].rstrip('/'):
+                sources.append('{0}={1}'.format(platform, self.apis[platform]))
+        return '@'.join([name] + sources)
+
+    def _action_cache(self, action):
+        """ 获取 action 检索结果所在的缓存
+
+        stdName 返回按检索优先级读取各平台缓存的只读视图，无需合并复制各平台缓存
+        """
+        if action == 'stdName':
+            return StdCacheView(self.cache)
+        return self.cache[ACTION_PLATFORMS[action][0]]
+
+    def _action_func(self, action):
+        """ 获取从缓存的检索结果中提取 action 所需数据的方法
+        """
+        action_func = {
+            # 注意 stdName 的 col 函数置于元组最后，
+            # 以避免 ipni/powo 中与 col 同名的字段
+            # 被 col 函数解析。
+            'stdName': (self.ipni_name, self.powo_name, self.tropicos_name, self.col_name),
+            'colTaxonTree': self.col_taxontree,
+            'colName': self.col_name,
+            'colSynonyms': self.col_synonyms,
+            'colAccepted': self.col_accepted,
+            'ipniName': self.ipni_name,
+            'ipniReference': self.ipni_reference,
+            'powoName': self.powo_name,
+            'powoAccepted': self.powo_accepted,
+            'powoImages': self.powo_images,
+            'tropicosName': self.tropicos_name,
+            'tropicosAccepted': self.tropicos_accepted,
+            # 'tropicosSynonyms': self.tropicos_synonyms
+        }
+        return action_func[action]
 
     def get_cache_result(self, query_result, get_result):
         """ 从检索缓存中提取数据
@@ -209,6 +1047,16 @@ class BioName:
                       元素样式为：raw_name:(simpleName, rank ,author, raw_name)
         return: 返回 None, 检索结果会直接写入 self.cache
         """
+        # 在共享传输层的事件循环中执行，以复用已经建立的连接
+        self.transport.run(self.async_web_get(action, search_terms))
+
+    async def async_web_get(self, action, search_terms, session=None):
+        """ web_get 的协程版本，在当前事件循环中执行
+
+        session: 可选的 aiohttp.ClientSession，缺省时使用传输层共享的连接池
+        """
+        if self.server is not None and await self._server_web_get(action, search_terms):
+            return
         get_action = {
             'stdName': self.get_name,
             'colTaxonTree': self.get_col_name,
@@ -224,43 +1072,85 @@ class BioName:
             'tropicosAccepted': self.get_tropicos_accepted
 
         }
-        self.pbar = tqdm(total=len(search_terms), desc=action, ascii=True)
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        self.sema = asyncio.Semaphore(500)
-        tasks = self.build_tasks(get_action[action], search_terms)
-        results = loop.run_until_complete(tasks)
-        # 修复 Windows 下出现的 RuntimeErro: Event loop is closed
-        # 为什么注销 close 会管用，我也没完全搞清楚
-        # 猜测可能是 asyncio 会自动关闭 loop
-        # 暂且先这样吧！
-        # loop.close()
+        # 记录本次请求失败的检索词
+        self.failures = set()
+        # 规范化后相同的检索词只检索一次
+        groups = self._group_querys(search_terms)
+        self.pbar = tqdm(total=len(groups), desc=action, ascii=True)
+        await self.build_tasks(get_action[action], groups, session)
         self.pbar.close()
-        for res in results:
-            try:
-                self.cache[res[-1]][res[0]] = res[1]
-            # 如果检索失败，则不写入缓存
-            except TypeError:
-                pass
+        # 将检索结果映射回同一检索词的其他写法
+        for raw_name, variants in groups.items():
+            for platform in ACTION_PLATFORMS[action]:
+                if raw_name in self.cache[platform]:
+                    for variant in variants:
+                        self.cache[platform][variant] = self.cache[platform][raw_name]
+            if raw_name in self.failures:
+                self.failures.update(variants)
+
+    def _group_querys(self, search_terms):
+        """ 按照规范化的检索词对 search_terms 分组
+
+        return: 由 代表检索词:同组其他原始检索词列表 组成的字典，
+                代表检索词为各组中首个出现的原始检索词
+        """
+        groups = {}
+        representatives = {}
+        for raw_name in search_terms:
+            query = self.querys[raw_name]
+            if not query:
+                continue
+            key = self._cache_key(query)
+            if key in representatives:
+                groups[representatives[key]].append(raw_name)
+            else:
+                representatives[key] = raw_name
+                groups[raw_name] = []
+        return groups
 
-    async def build_tasks(self, action_func, search_terms):
-        async with aiohttp.ClientSession() as session:
-            tasks = [
-                self.web_get_track(
-                    action_func,
-                    self.querys[rawname],
-                    session
-                )
-                # query 值为 None 的将不参与web get
-                for rawname in search_terms if self.querys[rawname]
-            ]
-            return await asyncio.gather(*tasks)
+    async def _server_web_get(self, action, search_terms):
+        """ 将 search_terms 提交给 NameServer 检索，检索结果写入 self.cache
+
+        return: 服务无法连接时返回 False，此后本实例不再使用该服务
+        """
+        try:
+            cache, failures = await self.server.resolve(action, search_terms)
+        except NameServerError as e:
+            print("\n学名检索服务连接失败，改为直接检索：{}".format(e))
+            self.server = None
+            return False
+        for platform, items in cache.items():
+            self.cache[platform].update(items)
+        self.failures = failures
+        return True
+
+    async def build_tasks(self, action_func, search_terms, session=None):
+        """
+        session: 可选的 aiohttp.ClientSession，缺省时使用传输层共享的连接池，
+                 各上游服务的并发数由传输层统一控制
+        """
+        tasks = [
+            self.web_get_track(
+                action_func,
+                self.querys[rawname],
+                session
+            )
+            # query 值为 None 的将不参与web get
+            for rawname in search_terms if self.querys[rawname]
+        ]
+        return await asyncio.gather(*tasks)
 
     async def web_get_track(self, func, param, session):
-        async with self.sema:
-            result = await func(param, session)
-            self.pbar.update(1)
-            return result
+        result = await func(param, session)
+        if result is None:
+            # 网络请求失败时，检索函数不会返回检索结果
+            self.failures.add(param[-1])
+        else:
+            self._cache_name(result)
+        if self.on_resolved is not None:
+            self.on_resolved(param)
+        self.pbar.update(1)
+        return result
 
     # 以下多个方法用于对 Api 返回结果进行有针对性的处理
     # 并根据具体调用的方法，返回用户所需要的数据
@@ -433,9 +1323,8 @@ class BioName:
         """
         return: simple_name, Filters(platform_rank), authors, raw_name
         """
-        raw2stdname = dict.fromkeys(self.names)
-        for raw_name in raw2stdname:
-            split_name = self._format_name(raw_name)
+        raw2stdname = self._split_names()
+        for raw_name, split_name in raw2stdname.items():
             if split_name is None:
                 raw2stdname[raw_name] = None
                 continue
@@ -449,55 +1338,124 @@ class BioName:
         return raw2stdname
 
     async def async_request(self, url, session):
-        try:
-            while True:
-                # print(url)
-                async with session.get(url, timeout=60) as resp:
-                    if resp.status == 429:
-                        await asyncio.sleep(3)
-                    else:
-                        response = await resp.json()
-                        # print(response)
-                        break
-        except BaseException:  # 如果异步请求出错，改为正常的 Get 请求以尽可能确保有返回结果
-            response = await self.normal_request(url)
+        # 请求失败时以指数退避方式异步重试，不会阻塞事件循环
+        response = await self.transport.request_json(
+            url, session=session, stats=self.stats, label=self._api_platform(url))
         if not response:
             print("\n", url, "联网超时，请检查网络连接！")
         return response  # 返回 None 表示网络有问题
 
-    async def normal_request(self, url):
-        try:
-            while True:
-                rps = requests.get(url)
-                # print(rps.status_code)
-                if rps.status_code == 429:
-                    await asyncio.sleep(3)
-                else:
-                    return rps.json()
-        except BaseException:
-            return None
+    def _api_platform(self, url):
+        """ 由请求地址获取请求统计中记录的平台名称，非检索平台的地址返回其 host
+        """
+        for platform, api in self.apis.items():
+            if url.startswith(api):
+                return platform
+        return urllib.parse.urlsplit(url).netloc
 
     async def get_name(self, query, session):
-        name = await self.get_ipni_name(query, session)
-        if name and name[1]:
-            return name
+        funcs = (self.get_ipni_name, self.get_powo_name, self.get_tropicos_name, self.get_col_name)
+        if self.cascade == 'parallel':
+            name = await self._parallel_name(funcs, query, session)
+        elif self.cascade == 'hedged':
+            name = await self._hedged_name(funcs, query, session)
+        else:
+            name = await self._sequential_name(funcs, query, session)
+        if name is None:
+            self.stats.record_cascade('failed')
         else:
-            name = await self.get_powo_name(query, session)
+            # 记录选定结果的平台，stdName 的结果按此从各平台缓存中读取
+            self.cache['stdName'][name[0]] = name[-1]
+            self.stats.record_cascade(name[-1] if name[1] else 'unresolved')
+        return name
+
+    async def _sequential_name(self, funcs, query, session):
+        """ 逐一检索 stdName 的各平台，前一平台查无结果后再检索下一平台
+        """
+        names = []
+        for func in funcs:
+            name = await func(query, session)
             if name and name[1]:
                 return name
-            else:
-                name = await self.get_tropicos_name(query, session)
-                if name and name[1]:
+            names.append(name)
+        return self._select_name(names)
+
+    async def _parallel_name(self, funcs, query, session):
+        """ 同时检索 stdName 的全部平台，按优先级选取结果
+
+        选定结果后，各平台返回的结果（包括查无结果）都会写入相应平台的缓存
+        """
+        names = await asyncio.gather(*[func(query, session) for func in funcs])
+        name = self._select_name(names)
+        if name is not None:
+            for result in names:
+                self._cache_name(result)
+        return name
+
+    def _select_name(self, names):
+        """ 按平台优先级从 stdName 各平台的检索结果中选取最终结果
+
+        names: 按优先级排列的各平台检索结果，请求失败的平台为 None
+
+        return: 各平台均查无结果、但有平台请求失败时返回 None，使该检索词
+                记为请求失败并在之后重新检索，而不是作为查无结果缓存
+        """
+        for name in names:
+            if name and name[1]:
+                return name
+        if any(name is None for name in names):
+            return None
+        return names[-1]
+
+    async def _hedged_name(self, funcs, query, session):
+        """ 对冲检索 stdName
+
+        按优先级等待各平台的结果，当前平台超过 self.hedge_delay 秒仍未返回时，
+        提前发起下一平台的检索；选定结果后，尚未返回的低优先级检索会被取消，
+        已经返回的结果则写入相应平台的缓存
+        """
+        tasks = []
+        name = None
+
+        def launch():
+            tasks.append(asyncio.ensure_future(funcs[len(tasks)](query, session)))
+
+        launch()
+        try:
+            for i in range(len(funcs)):
+                if i == len(tasks):
+                    launch()
+                while not tasks[i].done():
+                    timeout = self.hedge_delay if len(tasks) < len(funcs) else None
+                    await asyncio.wait((tasks[i],), timeout=timeout)
+                    if not tasks[i].done():
+                        launch()
+                result = tasks[i].result()
+                if i < len(funcs) - 1 and result and result[1]:
+                    name = result
                     return name
+            name = self._select_name([task.result() for task in tasks])
+            return name
+        finally:
+            for task in tasks:
+                if task.done() and not task.cancelled() and task.exception() is None:
+                    # 有平台请求失败且无检索结果时，不缓存各平台的查无结果
+                    if name is not None:
+                        self._cache_name(task.result())
                 else:
-                    return await self.get_col_name(query, session)
+                    task.cancel()
+
+    def _cache_name(self, name):
+        # 检索失败时 name 为 None，不写入缓存
+        if name:
+            self.cache[name[-1]][name[0]] = name[1]
 
     async def get_tropicos_accepted(self, query, session):
         name = await self.check_tropicos_name(query, session)
         if name is None:
             return query[-1], None, 'tropicosAccepted'
         elif name:
-            api = '/'.join([TROPICOS_API, str(name['NameId'])])
+            api = '/'.join([self.apis['tropicos'], str(name['NameId'])])
             accepted_name = await self.tropicos_search(api, '', Filters.acceptedname, session)
             if accepted_name:
                 return query[-1], accepted_name[0], 'tropicosAccepted'
@@ -511,7 +1469,7 @@ class BioName:
             return query[-1], name, 'tropicosName'
 
     async def check_tropicos_name(self, query, session):
-        names = await self.tropicos_search(TROPICOS_API, query[0], query[1], session)
+        names = await self.tropicos_search(self.apis['tropicos'], query[0], query[1], session)
         if not names:
             return names
         else:
@@ -625,8 +1583,11 @@ class BioName:
                     return None
 
     async def col_search(self, query, filters, session):
+        if self.checklist is not None:
+            # 本地名录的返回结构与 COL 接口一致，无需联网
+            return self.checklist.search(query, filters)
         params = self._build_col_params(query, filters)
-        url = self.build_url(SP2000_API, filters.value['col'], params)
+        url = self.build_url(self.apis['col'], filters.value['col'], params)
         # print(url)
         resp = await self.async_request(url, session)
         try:
@@ -638,11 +1599,12 @@ class BioName:
                     # 出错后，确定可以返回科的信息
                     return resp['data']['familes']
             elif resp['code'] == 400:
+                # 参数或密钥错误并非查无结果，按请求失败处理，以免被作为查无结果缓存
                 print("\n参数不合法：{0}\n".format(url))
-                return None
+                return False
             elif resp['code'] == 401:
                 print("\n密钥错误：{0}\n".format(url))
-                return None
+                return False
             else:
                 return None
         except KeyError:
@@ -673,7 +1635,9 @@ class BioName:
 
         return: 返回最满足 query 条件的学名 dict
         """
-        results = await self.kew_search(query[0], query[1], IPNI_API, session)
+        results = await self.kew_search(
+            query[0], query[1], self.apis['ipni'], session,
+            self._kew_complete(query, self._ipni_author_team))
         if not results:
             return results
         else:
@@ -689,22 +1653,7 @@ class BioName:
             elif authors == []:
                 return names[0]
             else:
-                std_teams = []
-                for r in names:
-                    author_team = [a["name"] for a in r["authorTeam"]]
-                    if author_team:
-                        std_teams.append(author_team)
-                    else:
-                        # ipni 一些学名的检索返回会有 authorTeam = []
-                        # 但 authors 却有值的情况，此时可以基于 authors
-                        # 生成可用于比对的 authorTeam
-                        try:
-                            std_teams.append(
-                                self.get_author_team(r['authors']))
-                        except KeyError:
-                            # ipni 有些标注为 auct.not_stated 的名称，没有任何命名人信息
-                            r['authors'] = None
-                            std_teams.append([])
+                std_teams = [self._ipni_author_team(r) for r in names]
                 # 开始比对原命名人与可选学名的命名人的比对结果
                 scores = self.contrast_authors(authors, std_teams)
                 index = self._get_best_name(scores)
@@ -729,7 +1678,9 @@ class BioName:
 
         return: 返回最满足 query 条件的学名 dict
         """
-        results = await self.kew_search(query[0], query[1], POWO_API, session)
+        results = await self.kew_search(
+            query[0], query[1], self.apis['powo'], session,
+            self._kew_complete(query, self._powo_author_team, accepted=True))
         if not results:
             # 查无结果或者未能成功查询，返回带英文问号的结果以被人工核查
             return results
@@ -737,14 +1688,7 @@ class BioName:
             names = []
             for res in results:
                 if res["name"] == query[0]:
-                    try:
-                        res['authorTeam'] = self.get_author_team(res['author'])
-                    except KeyError:
-                        # 如果查询的结果中没有命名人信息,则补充空值
-                        # 如果匹配结果只有这一个结果，采用该结果
-                        # 如果匹配结果有多个，该结果后续将因 autorTeam 为空排除
-                        res['author'] = None
-                        res['authorTeam'] = []
+                    self._powo_author_team(res)
                     names.append(res)
             authors = self.get_author_team(query[2])
             # 如果搜索名称和返回名称不一致，标注后待人工核查
@@ -767,7 +1711,61 @@ class BioName:
                 else:
                     return None
 
-    async def kew_search(self, query, filters, api, session):
+    def _ipni_author_team(self, record):
+        author_team = [a["name"] for a in record["authorTeam"]]
+        if author_team:
+            return author_team
+        # ipni 一些学名的检索返回会有 authorTeam = []
+        # 但 authors 却有值的情况，此时可以基于 authors
+        # 生成可用于比对的 authorTeam
+        authors = record.get('authors')
+        if authors is None:
+            # ipni 有些标注为 auct.not_stated 的名称，没有任何命名人信息
+            record['authors'] = None
+            return []
+        return self.get_author_team(authors)
+
+    def _powo_author_team(self, record):
+        author = record.get('author')
+        if author is None:
+            # 如果查询的结果中没有命名人信息,则补充空值
+            # 如果匹配结果只有这一个结果，采用该结果
+            # 如果匹配结果有多个，该结果后续将因 autorTeam 为空排除
+            record['author'] = None
+            record['authorTeam'] = []
+        else:
+            record['authorTeam'] = self.get_author_team(author)
+        return record['authorTeam']
+
+    def _kew_complete(self, query, author_team, accepted=False):
+        """ 生成精简检索模式下判断是否还需要获取后续检索结果的函数
+
+        已经获取的同名学名中，存在命名人完全匹配（得分 100）的学名时，后续结果
+        不会改变 check_ipni_name、check_powo_name 的选取结果；检索词缺少命名人时，
+        只需存在同名学名，accepted 为 True 时还需其为接受名
+
+        author_team: 由检索结果生成命名人列表的方法
+
+        return: 未启用精简模式时返回 None
+        """
+        if not self.lean:
+            return None
+        authors = self.get_author_team(query[2])
+
+        def complete(names):
+            if authors == []:
+                return not accepted or any(name.get('accepted') == True for name in names)
+            scores = self.contrast_authors(authors, [author_team(name) for name in names])
+            return any(score == 100 for score, _ in scores)
+        return complete
+
+    async def kew_search(self, query, filters, api, session, complete=None):
+        """
+        complete: 精简检索模式下判断是否已经获得足够检索结果的函数，
+                  参见 _kew_complete，为 None 时一次获取全部检索结果
+        """
+        if complete is not None and isinstance(query, str):
+            return await self._lean_kew_search(query, filters, api, session, complete)
         params = self._build_kew_params(query, filters)
         resp = await self.async_request(self.build_url(api, 'search', params), session)
         try:
@@ -782,15 +1780,18 @@ class BioName:
     def native_get(self, querys, names):
         """
             querys: build_querys 形成的待查询名称及其解构信息组成的字典
-            names: 由学名组成的 Series, 用于被比较和提取
+            names: 由学名组成的 Series, 用于被比较和提取，也可以是预先建立的
+                   NativeNameIndex，以便在多次检索之间复用
         """
+        if not isinstance(names, NativeNameIndex):
+            names = NativeNameIndex(names, parser=self)
         results = {}
         for query in tqdm(querys.values()):
             if query is None:
                 continue
-            homonyms = names[names.str.startswith(query[0])]
-            if not homonyms.empty:
-                name = self.check_native_name(query, homonyms)
+            homonym, author_teams = names.candidates(query[0])
+            if homonym:
+                name = self._match_native_name(query, homonym, author_teams)
                 if name:
                     results[query[-1]] = name
                 else:
@@ -811,6 +1812,14 @@ class BioName:
                 homonym.append(name)
             else:
                 continue
+        return self._match_native_name(query, homonym, author_teams)
+
+    def _match_native_name(self, query, homonym, author_teams):
+        """ 从同名的本地学名中选取与 query 命名人最匹配的学名
+
+        homonym: 与 query 同名的本地学名，元素为 apiName 样式的元组
+        author_teams: 与 homonym 一一对应的命名人列表
+        """
         if homonym:
             org_author_team = self.get_author_team(query[2])
             # 如果查询名称有命名人, 或者匹配名称没有命名人, 返回匹配但同名结果第一个
@@ -826,8 +1835,49 @@ class BioName:
         else:
             return None
 
+    async def _lean_kew_search(self, query, filters, api, session, complete):
+        """ 分页获取 IPNI、POWO 的检索结果，只保留与 query 同名的结果
+
+        首页只获取 LEAN_PAGE_SIZE 条结果，之后每页为前一页的 4 倍，累计至多
+        KEW_MAX_RESULTS 条，与完整检索获取的结果范围相同；complete 返回 True
+        或者没有后续结果时停止获取
+
+        return: 与 kew_search 相同，网络中断返回 False，检索不到返回 None
+        """
+        params = self._build_kew_params(query, filters)
+        per_page = LEAN_PAGE_SIZE
+        names = []
+        seen = 0
+        while True:
+            params['perPage'] = min(per_page, KEW_MAX_RESULTS - seen)
+            resp = await self.async_request(self.build_url(api, 'search', params), session)
+            try:
+                results = resp['results']
+            except TypeError:
+                # 网络中断，返回 False
+                return False
+            except KeyError:
+                if not seen:
+                    # 检索不到，返回 None
+                    return None
+                break
+            seen += len(results)
+            # 不同名的结果不会被选取，这里直接丢弃
+            names.extend(res for res in results if res.get('name') == query)
+            if names and complete(names):
+                break
+            if (len(results) < params['perPage'] or seen >= KEW_MAX_RESULTS
+                    or seen >= resp.get('totalResults', KEW_MAX_RESULTS) or not resp.get('cursor')):
+                break
+            params['cursor'] = resp['cursor']
+            per_page *= 4
+        # 没有同名结果时，与完整检索一样交由 check 方法返回查无结果
+        if names:
+            return names
+        return None if seen else []
+
     def _build_kew_params(self, query, filters):
-        params = {'perPage': 500, 'cursor': '*'}
+        params = {'perPage': KEW_MAX_RESULTS, 'cursor': '*'}
         if query:
             params['q'] = self._format_kew_query(query)
         if filters:
@@ -858,54 +1908,11 @@ class BioName:
             return: 命名人的各个组成部分构成的元组
                     如果无法提取合法的学名，则返回 None
         """
-        species_pattern = re.compile(
-            r"((?:!×\s?|×\s?|!)?[A-Z][a-zàäçéèêëöôùûüîï-]+)\s*(×\s+|X\s+|x\s+|×)?([a-zàâäèéêëîïôœùûüÿç][a-zàâäèéêëîïôœùûüÿç-]+)?\s*(.*)")
-        subspecies_pattern = re.compile(
-            r"(^[\"\'A-Z\(\.].*?[^A-Z-\s]\s*(?=$|var\.|subvar\.|subsp\.|ssp\.|f\.|fo\.|subf\.|form\.|forma|nothosp\.|cv\.|cultivar\.))?(var\.|subvar\.|subsp\.|ssp\.|f\.|fo\.|subf\.|form\.|forma|nothosp\.|cv\.|cultivar\.)?\s*([a-zàäçéèêëöôùûüîï][a-zàäçéèêëöôùûüîï][a-zàäçéèêëöôùûüîï-]+)?\s*([\"\'（A-Z\(].*?[^A-Z-])?$")
         try:
-            species_split = species_pattern.findall(raw_name)[0]
-        except BaseException:
+            return parse_name(raw_name)
+        except TypeError:
+            # 不可哈希的对象无法缓存，也不是合法的学名
             return None
-        subspec_split = subspecies_pattern.findall(species_split[3])[0]
-
-        genus = species_split[0]
-        if species_split[1] == "":
-            species = species_split[2]
-        else:
-            species = " ".join(['×', species_split[2]])
-        if subspec_split[2] == "":
-            authors = species_split[3]
-            taxon_rank = ""
-            infraspecies = ""
-            first_authors = ""
-            if species_split[2] != "":
-                platform_rank = Filters.specific
-            elif genus.lower().endswith((
-                "aceae", "idae", "umbelliferae", "labiatae", "compositae", "gramineae",
-                    "leguminosae")):
-                platform_rank = Filters.familial
-            else:
-                platform_rank = Filters.generic
-        else:
-            infraspecies = subspec_split[2]
-            if infraspecies != species:
-                taxon_rank = subspec_split[1]
-                first_authors = subspec_split[0].strip()
-                authors = subspec_split[3].strip()
-                platform_rank = Filters.infraspecific
-            else:
-                # 原变种等种下加词和种加词一致的，种下和种命名人一致
-                # 这里将其作为种一级的名称进行处理
-                authors = subspec_split[0].strip()
-                if authors:
-                    pass
-                else:
-                    authors = subspec_split[3].strip()
-                taxon_rank = ""
-                first_authors = ""
-                infraspecies = ""
-                platform_rank = Filters.specific
-        return genus, species, taxon_rank, infraspecies, authors, first_authors, platform_rank, raw_name
 
     def fill_blank_name(self, pattern):
         if pattern == 'simpleName':
@@ -963,12 +1970,22 @@ class BioName:
             raise ValueError("学名处理参数错误，不存在{}".format(pattern))
 
     def format_latin_names(self, pattern):
-        raw2stdname = dict.fromkeys(self.names)
-        for raw_name in raw2stdname:
-            split_name = self._format_name(raw_name)
+        raw2stdname = self._split_names()
+        for raw_name, split_name in raw2stdname.items():
             raw2stdname[raw_name] = self.built_name_style(split_name, pattern)
         return [raw2stdname[name] for name in self.names]
 
+    def _split_names(self):
+        """ 解析 self.names 中不重复的学名
+
+        return: 由 原始学名:_format_name 解析结果 组成的字典
+        """
+        raw_names = list(dict.fromkeys(self.names))
+        if self.workers and self.workers > 1 and len(raw_names) >= self.parallel_threshold:
+            return dict(zip(raw_names, parse_unique_names(
+                raw_names, self.workers, self.parallel_threshold)))
+        return {raw_name: self._format_name(raw_name) for raw_name in raw_names}
+
     def _get_best_name(self, scores):
         """
         scores: 由 contrast_authors 返回的比对结果
@@ -994,9 +2011,11 @@ class BioName:
         return: 返回一个与原命名人匹配亲近关系排列的list
         """
         raw_team = [self.clean_author(author) for author in author_team]
+        std_teams = [[self.clean_author(author) for author in std_team] for std_team in author_teams]
+        if rprocess is not None:
+            return score_author_teams(raw_team, std_teams)
         s_teams_score = []
-        for n, std_team in enumerate(author_teams):
-            std_team = [self.clean_author(author) for author in std_team]
+        for n, std_team in enumerate(std_teams):
             score = []
             for r_author in raw_team:
                 match = process.extract(
@@ -1022,48 +2041,13 @@ class BioName:
         return s_teams_score
 
     def clean_author(self, author):
-        aut = author.replace(".", " ")
-        aut = aut.replace("-", " ")
-        aut = aut.replace("'", " ")
-        aut = aut.replace("  ", " ")
-        return aut.strip()
+        return clean_author(author)
 
     def strip_accents(self, text):
-        """尽最大可能将字符串中衍生的拉丁字母转换为英文字母
-
-        Args:
-            text (str): 需要处理的字符串，比如 'PančićDiklić & V.NikolićØ的'
-
-        Returns:
-            str: 转换后的字符串，注意 text 中某些字符，可能由于无法转换为英文字母而被删除
-        """
-        # 统一一些组合字符的不同写法，以使其等价，比如 é 和 e\u0301
-        # 这里 normalize 的模式必须设置为 NFD 而非 NFC，否则后续decode
-        # 方法将无法给一些非 ascii 字符分配一个合适的 ascii 字符
-        text = unicodedata.normalize('NFD', text)
-        # 将命名人中的不同字符尽可能转化为 a-ZA-Z
-        # 比如 PančićDiklić & V.Nikolić 转换为 PancicDiklic & V.Nikolic
-        # 注意：字符串中的一些特殊字符可能无法转换，比如字符 Ø， 这些字符将被从字符串中删除
-        ascii_text = text.encode('ascii', 'ignore').decode('utf-8')
-        return ascii_text
+        return strip_accents(text)
 
     def ascii_authors(self, authors, discard=True):
-        # strip_accents 并不能将所有字符转换为 ascii
-        # 这些字符在返回的结果中会被删除
-        pinyin = {'ß': 'ss', 'æ': 'ae', 'Ø': 'O', 'ø': 'o', 'þ': 'th', 'ð': 'd',
-                  'Ɖ': 'D', 'ł': 'l', 'đ': 'd', 'ı': 'i', 'Р': 'R', 'Т': 'T'}
-        # 先尽可能的将特殊文本转换为大小写英文字母
-        authors = authors.translate(str.maketrans(pinyin))
-        if discard:
-            # 然后再进行字符转换，其中有些字母可能仍然无法转换
-            ascii_authors = self.strip_accents(authors)
-        else:
-            # 如果仍然存在无法转换为英文的字母，则在 authors 中予以保留该字符
-            chars = [self.strip_accents(word) if self.strip_accents(
-                word) else word for word in authors]
-            ascii_authors = ''.join(chars)
-            #print(f'\n 命名人中存在特殊字符，程序目前无法识别 {ascii_authors} \n')
-        return ascii_authors
+        return ascii_authors(authors, discard)
 
     def get_author_team(self, authors):
         """ 提取学名命名人中，各个命名人的名字
@@ -1072,44 +2056,10 @@ class BioName:
 
         return: 返回包含authors 中所有人名list 或 []
         """
-        if authors.startswith('（'): 
-            authors = authors.replace('（', '(')
-            authors = authors.replace('）', ')')
-        if authors.startswith('('):
-            if authors.find(')') < authors.find(' ex '):
-                # authors 等于 ) 前的字符串加上 ex 后的字符串
-                authors = authors[:authors.find(')')+1] + authors[authors.find(' ex ')+3:]
-            if 'in ' in authors and authors.find(')') > authors.find(' in '):
-                # authors 等于 in 之前的字符串加上 ) 后的字符串
-                authors = authors[:authors.find(' in ')] + authors[authors.find(')'):]
-        # 排除 authors 中 ex 前的命名人
-        authors = authors.split(' ex ')[1].strip() if ' ex ' in authors else authors
-        # 排除 authors 中 in 后的命名人
-        authors = authors.split(' in ')[0].strip() if ' in ' in authors else authors
-        try:
-            authors = self.ascii_authors(authors)
-        # authors 为空
-        except AttributeError:
-            return []
-        # 命名人可能是有一至多个部分组成，这里通过四种模式猜测可能的名称组成形式
-        p = re.compile(
-            r"(?:^|\(\s*|\s+et\s+|\s+ex\s+|\&\s*|\,\s*|\)\s*|\s+and\s+|\[\s*|\（\s*|\）\s*|\，\s*|\{\s*|\}\s*)([^\s\&\(\)\,\;\.\-\?\，\（\）\[\]\{\}][^\&\(\)\,\;\，\（\）\[\]\{\}]+?(?=\s+ex\s+|\s+et\s+|\s*\&|\s*\,|\s*\)|\s*\(|\s+and\s+|\s+in\s+|\s*\）|\s*\（|\s*\，|\s*\;|\s*\]|\s*\[|\s*\}|\s*\{|\s*$))")
-        author_team = p.findall(authors)
-        author_team = self.check_author_team(author_team)
-        return author_team
-    
+        return list(parse_author_team(authors))
+
     def check_author_team(self, author_team):
-        # 判断 author_team 中是否存在全部是小写字母组成的元素
-        # 比如 comb. nov. cons. stat.，这些标识可能会被误认为是命名人
-        # 如果存在，就删除这个元素
-        for author in author_team.copy():
-            if author.islower():
-                # 一些命名人可能存在自指的情况
-                # 比如 Ania elmeri (Ames & sine ref.) A.D.Hawkes
-                # sine ref. 虽然是小写字母，但它应该作为 Ames 的一部分
-                # 程序这里没有对这种情况做处理，以后可以考虑加入
-                author_team.remove(author)
-        return author_team
+        return check_author_team(author_team)
 
     def __call__(self, mark=True):
         """
@@ -1184,3 +2134,88 @@ class BioName:
         else:
             print("\n学名处理参数有误，不存在{}\n".format(self.style))
             return pd.DataFrame(self.names)
+
+
+class NativeNameIndex:
+    """ 本地学名库的检索索引
+
+    get_native_name 需要将每个检索词与本地学名库逐一比对，NativeNameIndex
+    预先解析学名库中的每个学名，并以不含命名人的学名为 key 建立索引，同时
+    保存各学名解析后的命名人列表，检索时无需再扫描和解析整个学名库。
+    索引可以通过 save 保存到本地，并通过 load 在之后的检索中复用。
+    """
+
+    def __init__(self, names, parser=None):
+        """
+        names: 由学名组成的 Series 或其他可迭代对象
+        parser: 用于解析学名的 BioName 实例，缺省时新建一个
+        """
+        if parser is None:
+            parser = BioName([])
+        self.index = {}
+        for raw_name in names:
+            if not isinstance(raw_name, str):
+                continue
+            split_name = parser._format_name(raw_name)
+            name = parser.built_name_style(split_name, 'apiName')
+            if name[0]:
+                # 缺少命名人的学名，其命名人列表为 []
+                author_team = parser.get_author_team(name[1]) if name[1] else []
+                self.index.setdefault(name[0], []).append((raw_name, name, author_team))
+
+    def candidates(self, simple_name):
+        """ 获取与 simple_name 同名的本地学名
+
+        return: (homonym, author_teams)，homonym 由 apiName 样式的学名元组组成，
+                author_teams 为对应的命名人列表，二者均保持学名库中的原有顺序
+        """
+        homonym = []
+        author_teams = []
+        for raw_name, name, author_team in self.index.get(simple_name, ()):
+            # 与逐一比对时一致，只采用以检索词开头的原始学名
+            if raw_name.startswith(simple_name):
+                homonym.append(name)
+                author_teams.append(author_team)
+        return homonym, author_teams
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump(self.index, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        index = cls.__new__(cls)
+        with open(path, 'rb') as f:
+            index.index = pickle.load(f)
+        return index
+
+    def __len__(self):
+        return sum(len(names) for names in self.index.values())
+
+
+class StdCacheView(Mapping):
+    """ stdName 各平台缓存的只读视图
+
+    按 self.cache['stdName'] 中记录的各检索词选定结果的平台读取结果，选定的
+    平台尚未记录或者该平台的结果不在缓存中时，视为尚未完成检索
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.selected = cache['stdName']
+
+    def __getitem__(self, raw_name):
+        return self.cache[self.selected[raw_name]][raw_name]
+
+    def __contains__(self, raw_name):
+        platform = self.selected.get(raw_name)
+        return platform is not None and raw_name in self.cache[platform]
+
+    def __iter__(self):
+        return (raw_name for raw_name in self.selected if raw_name in self)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __bool__(self):
+        return any(True for _ in self)
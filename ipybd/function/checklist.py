@@ -0,0 +1,329 @@
+import csv
+import io
+import os
+import sqlite3
+import sys
+import zipfile
+from xml.etree import ElementTree
+
+from ipybd.function.api_terms import Filters
+
+
+# 高级分类阶元，与 COL 返回结果中 taxonTree 的 key 一致
+HIGHER_RANKS = ('genus', 'family', 'order', 'class', 'phylum', 'kingdom')
+
+# 导入时使用的 Darwin Core 字段
+TAXON_TERMS = (
+    'taxonID', 'scientificName', 'scientificNameAuthorship', 'canonicalName',
+    'taxonRank', 'taxonomicStatus', 'acceptedNameUsageID', 'parentNameUsageID'
+) + HIGHER_RANKS
+
+# taxonomicStatus 与 COL 接口 name_status 的对应关系
+STATUS_MAPPING = {
+    'accepted': 'accepted name',
+    'valid': 'accepted name',
+    'provisionally accepted': 'provisionally accepted name',
+    'doubtful': 'accepted name',
+    'synonym': 'synonym',
+    'heterotypic synonym': 'synonym',
+    'homotypic synonym': 'synonym',
+    'proparte synonym': 'ambiguous synonym',
+    'ambiguous synonym': 'ambiguous synonym',
+    'misapplied': 'misapplied name'
+}
+
+
+class LocalChecklist:
+    """ 基于本地物种名录的学名检索后端
+
+    将 Darwin Core Archive（如 ChecklistBank 导出的名录）中的 Taxon 数据导入
+    带索引的 SQLite 文件，供 BioName 在离线环境下代替中国生物物种名录（COL）
+    的在线接口，检索结果的结构与 COL 接口一致，因此 colName、colAccepted、
+    colSynonyms、colTaxonTree 等操作的返回结果与在线检索相同。
+    """
+
+    def __init__(self, path):
+        """
+        path: SQLite 文件路径，文件不存在时会新建一个空名录
+        """
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS taxa (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                authorship TEXT,
+                rank TEXT,
+                status TEXT,
+                accepted_id TEXT,
+                parent_id TEXT,
+                genus TEXT,
+                family TEXT,
+                "order" TEXT,
+                class TEXT,
+                phylum TEXT,
+                kingdom TEXT
+            )"""
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS taxa_name ON taxa (name)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS taxa_accepted ON taxa (accepted_id)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS taxa_genus ON taxa (genus)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS taxa_family ON taxa (family)")
+        self.conn.commit()
+
+    def import_dwca(self, source, batch=10000):
+        """ 导入 Darwin Core Archive 的 Taxon 数据
+
+        source: DwC-A 压缩包、解压后的文件夹，或者单独的 taxon.txt 文件；
+                存在 meta.xml 时按其描述读取 core 文件，否则按首行字段名读取
+        batch: 每批写入的记录数
+
+        return: 导入的记录数
+        """
+        count = 0
+        rows = []
+        for record in self._read_dwca(source):
+            row = self._build_row(record)
+            if row is None:
+                continue
+            rows.append(row)
+            if len(rows) >= batch:
+                count += self._insert(rows)
+                rows = []
+        if rows:
+            count += self._insert(rows)
+        self._fill_classification()
+        return count
+
+    def search(self, query, filters):
+        """ 按照 COL 接口的返回结构检索名录
+
+        query: 不含命名人的学名
+        filters: Filters 类型的检索阶元
+
+        return: 由 COL 接口样式的 dict 组成的列表，查无结果时返回 None
+        """
+        if filters is Filters.familial:
+            results = self._search_family(query)
+        elif filters is Filters.generic:
+            results = self._search_genus(query)
+        else:
+            results = [
+                self._build_species(row) for row in
+                self.conn.execute("SELECT * FROM taxa WHERE name = ?", (query,))
+            ]
+        return results or None
+
+    def clear(self):
+        self.conn.execute("DELETE FROM taxa")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM taxa").fetchone()[0]
+
+    def _search_family(self, name):
+        row = self.conn.execute(
+            "SELECT * FROM taxa WHERE name = ? AND rank = 'family'", (name,)).fetchone()
+        if row is None:
+            # 名录中没有科的记录时，借用科下任一类群的分类信息
+            row = self.conn.execute(
+                "SELECT * FROM taxa WHERE family = ? LIMIT 1", (name,)).fetchone()
+            if row is None:
+                return []
+        result = self._taxon_tree(row)
+        del result['genus']
+        result['family'] = name
+        result['record_id'] = row['id'] if row['name'] == name else None
+        return [result]
+
+    def _search_genus(self, name):
+        row = self.conn.execute(
+            "SELECT * FROM taxa WHERE name = ? AND rank = 'genus'", (name,)).fetchone()
+        if row is None:
+            row = self.conn.execute(
+                "SELECT * FROM taxa WHERE genus = ? LIMIT 1", (name,)).fetchone()
+            if row is None:
+                return []
+        tree = self._taxon_tree(row)
+        tree['genus'] = name
+        return [{'accepted_name_info': {'taxonTree': tree}}]
+
+    def _build_species(self, row):
+        accepted = self._accepted(row)
+        synonyms = self.conn.execute(
+            "SELECT name, authorship FROM taxa WHERE accepted_id = ? AND id != ?",
+            (accepted['id'], accepted['id'])
+        ).fetchall()
+        return {
+            'name_code': row['id'],
+            'scientific_name': row['name'],
+            'author': row['authorship'],
+            'name_status': row['status'],
+            'family': row['family'],
+            'accepted_name_info': {
+                'namecode': accepted['id'],
+                'scientificName': accepted['name'],
+                'author': accepted['authorship'],
+                'taxonTree': self._taxon_tree(accepted),
+                'Synonyms': [
+                    {'synonym': ' '.join(filter(None, synonym))}
+                    for synonym in synonyms
+                ]
+            }
+        }
+
+    def _accepted(self, row):
+        if row['accepted_id'] and row['accepted_id'] != row['id']:
+            accepted = self.conn.execute(
+                "SELECT * FROM taxa WHERE id = ?", (row['accepted_id'],)).fetchone()
+            if accepted is not None:
+                return accepted
+        return row
+
+    def _taxon_tree(self, row):
+        return {rank: row[rank] for rank in HIGHER_RANKS}
+
+    def _read_dwca(self, source):
+        """ 逐行读取 DwC-A 的 core 文件
+
+        return: 由 字段名:值 组成的 dict 的生成器
+        """
+        if zipfile.is_zipfile(source):
+            archive = zipfile.ZipFile(source)
+            names = archive.namelist()
+
+            def open_file(name):
+                return io.TextIOWrapper(archive.open(name), encoding='utf-8')
+        elif os.path.isdir(source):
+            names = os.listdir(source)
+
+            def open_file(name):
+                return open(os.path.join(source, name), encoding='utf-8')
+        else:
+            names = []
+            directory, filename = os.path.split(source)
+            source = directory
+
+            def open_file(name):
+                return open(os.path.join(directory, name), encoding='utf-8')
+        meta = self._read_meta(open_file) if 'meta.xml' in names else None
+        if meta is None:
+            if names:
+                filename = [
+                    name for name in names
+                    if os.path.splitext(os.path.basename(name))[0].lower() == 'taxon'
+                ][0]
+            meta = {'location': filename, 'delimiter': '\t', 'quotechar': None,
+                    'header': 1, 'fields': None}
+        # 部分名录的引证、备注等字段很长，超出 csv 默认的字段长度限制
+        csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+        with open_file(meta['location']) as f:
+            if meta['quotechar']:
+                reader = csv.reader(f, delimiter=meta['delimiter'], quotechar=meta['quotechar'])
+            else:
+                reader = csv.reader(f, delimiter=meta['delimiter'], quoting=csv.QUOTE_NONE)
+            fields = meta['fields']
+            for i, line in enumerate(reader):
+                if i < meta['header']:
+                    if fields is None and i == 0:
+                        fields = {self._term(term): index for index, term in enumerate(line)}
+                    continue
+                yield {
+                    term: line[index] for term, index in fields.items()
+                    if index < len(line)
+                }
+
+    def _read_meta(self, open_file):
+        with open_file('meta.xml') as f:
+            root = ElementTree.fromstring(f.read())
+        core = [node for node in root if node.tag.endswith('core')][0]
+        location = [node for node in core.iter() if node.tag.endswith('location')][0].text
+        fields = {
+            self._term(node.get('term')): int(node.get('index'))
+            for node in core if node.tag.endswith('field') and node.get('index') is not None
+        }
+        id_node = [node for node in core if node.tag.endswith('id')]
+        if id_node and 'taxonID' not in fields:
+            fields['taxonID'] = int(id_node[0].get('index'))
+        delimiter = core.get('fieldsTerminatedBy', '\\t').encode().decode('unicode_escape')
+        quotechar = core.get('fieldsEnclosedBy', '')
+        return {
+            'location': location.strip(),
+            'delimiter': delimiter,
+            'quotechar': quotechar or None,
+            'header': int(core.get('ignoreHeaderLines', 0)),
+            'fields': fields
+        }
+
+    def _term(self, term):
+        # http://rs.tdwg.org/dwc/terms/scientificName、dwc:scientificName 均取 scientificName
+        return term.strip().rsplit('/', 1)[-1].rsplit(':', 1)[-1]
+
+    def _build_row(self, record):
+        taxon_id = record.get('taxonID')
+        scientific_name = record.get('scientificName', '').strip()
+        if not taxon_id or not scientific_name:
+            return None
+        authorship = record.get('scientificNameAuthorship', '').strip()
+        name = record.get('canonicalName', '').strip()
+        if not name:
+            # DwC 的 scientificName 通常包含命名人
+            if authorship and scientific_name.endswith(authorship):
+                name = scientific_name[:-len(authorship)].strip()
+            else:
+                name = scientific_name
+        rank = record.get('taxonRank', '').strip().lower() or None
+        status = record.get('taxonomicStatus', '').strip().lower()
+        accepted_id = record.get('acceptedNameUsageID') or None
+        if not status:
+            status = 'synonym' if accepted_id and accepted_id != taxon_id else 'accepted'
+        status = STATUS_MAPPING.get(status, status)
+        higher = [record.get(rank_name) or None for rank_name in HIGHER_RANKS]
+        if rank in HIGHER_RANKS:
+            higher[HIGHER_RANKS.index(rank)] = name
+        return (taxon_id, name, authorship or None, rank, status, accepted_id,
+                record.get('parentNameUsageID') or None, *higher)
+
+    def _insert(self, rows):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO taxa VALUES ({})".format(','.join('?' * 13)), rows)
+        self.conn.commit()
+        return len(rows)
+
+    def _fill_classification(self):
+        """ 对于缺少高级分类阶元字段的名录，沿 parentNameUsageID 补全分类信息
+        """
+        missing = self.conn.execute(
+            "SELECT COUNT(*) FROM taxa WHERE family IS NULL AND parent_id IS NOT NULL"
+        ).fetchone()[0]
+        if not missing:
+            return
+        parents = {
+            row[0]: (row[1], row[2], row[3])
+            for row in self.conn.execute("SELECT id, parent_id, rank, name FROM taxa")
+        }
+        updates = []
+        for row in self.conn.execute(
+                "SELECT id, parent_id, {} FROM taxa".format(
+                    ', '.join('"{}"'.format(rank) for rank in HIGHER_RANKS))).fetchall():
+            higher = dict(zip(HIGHER_RANKS, row[2:]))
+            parent_id, seen = row[1], set()
+            while parent_id in parents and parent_id not in seen:
+                seen.add(parent_id)
+                parent_id, rank, name = parents[parent_id]
+                if rank in higher and higher[rank] is None:
+                    higher[rank] = name
+            if list(higher.values()) != list(row[2:]):
+                updates.append([higher[rank] for rank in HIGHER_RANKS] + [row[0]])
+        self.conn.executemany(
+            "UPDATE taxa SET genus = ?, family = ?, \"order\" = ?, class = ?, phylum = ?, kingdom = ? WHERE id = ?",
+            updates
+        )
+        self.conn.commit()
@@ -0,0 +1,164 @@
+import json
+import os
+import sqlite3
+import time
+
+
+class CleanCache:
+    """ 数据清洗结果的本地持久化缓存
+
+    以 SQLite 文件存储 DateTime、GeoCoordinate、HumanName、AdminDiv 等值处理类
+    对每个原始值的处理结果，缓存的 key 由值处理类名称、影响处理结果的
+    参数（如 style、timezone、typ、min_num、max_num）和原始值组成。
+
+    每个条目都记录了值处理规则的版本，版本由值处理类所在源文件及其依赖的
+    参考数据文件的内容生成，规则变化后旧版本的条目不再被读取，并在首次读取
+    时被清除；缓存条目超过 max_entries 后，最久未被使用的条目会被优先清除。
+    """
+
+    def __init__(self, path, max_entries=5000000):
+        """
+        path: SQLite 缓存文件路径
+        max_entries: 缓存的最大条目数，为 None 时不限制
+        """
+        self.path = path
+        self.max_entries = max_entries
+        directory = os.path.dirname(os.path.abspath(path))
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS cleaned (
+                cleaner TEXT NOT NULL,
+                params TEXT NOT NULL,
+                raw TEXT NOT NULL,
+                result TEXT NOT NULL,
+                version TEXT NOT NULL,
+                accessed REAL NOT NULL,
+                PRIMARY KEY (cleaner, params, raw)
+            )"""
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS cleaned_accessed ON cleaned (accessed)")
+        # 各值处理类及参数返回的 DataFrame 的列名
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS columns (
+                cleaner TEXT NOT NULL,
+                params TEXT NOT NULL,
+                columns TEXT NOT NULL,
+                version TEXT NOT NULL,
+                PRIMARY KEY (cleaner, params)
+            )"""
+        )
+        self.conn.commit()
+        # 本次运行中已经清除过旧版本条目的值处理类
+        self.purged = set()
+
+    def get(self, cleaner, params, version, raws):
+        """ 批量读取某一值处理类在某一参数下的缓存
+
+        cleaner: 值处理类名称
+        params: 序列化后的参数
+        version: 值处理规则的版本
+        raws: 序列化后的原始值组成的可迭代对象
+
+        return: (由 原始值:处理结果 组成的字典, 列名)，缓存中没有列名时返回 ({}, None)
+        """
+        self._purge(cleaner, version)
+        row = self.conn.execute(
+            "SELECT columns FROM columns WHERE cleaner = ? AND params = ? AND version = ?",
+            (cleaner, params, version)
+        ).fetchone()
+        if row is None:
+            return {}, None
+        raws = list(set(raws))
+        results = {}
+        # SQLite 对单条语句的参数个数有限制，这里分批查询
+        for i in range(0, len(raws), 500):
+            batch = raws[i:i+500]
+            rows = self.conn.execute(
+                "SELECT raw, result FROM cleaned WHERE cleaner = ? AND params = ? AND version = ? AND raw IN ({})".format(
+                    ','.join('?' * len(batch))),
+                [cleaner, params, version] + batch
+            ).fetchall()
+            for raw, result in rows:
+                results[raw] = json.loads(result)
+        if results:
+            self._touch(cleaner, params, list(results), time.time())
+        return results, json.loads(row[0])
+
+    def set(self, cleaner, params, version, items, columns):
+        """ 批量写入某一值处理类在某一参数下的处理结果
+
+        items: 由 原始值:处理结果 组成的字典，处理结果为各列的值组成的列表，
+               须可以被 json 序列化
+        columns: 值处理类返回的 DataFrame 的列名
+        """
+        if not items:
+            return
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO columns VALUES (?, ?, ?, ?)",
+            (cleaner, params, json.dumps(columns, ensure_ascii=False), version)
+        )
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO cleaned VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (cleaner, params, raw, json.dumps(result, ensure_ascii=False), version, now)
+                for raw, result in items.items()
+            ]
+        )
+        self.conn.commit()
+        self.evict()
+
+    def evict(self):
+        """ 缓存超出 max_entries 时，清除最久未使用的条目
+        """
+        if self.max_entries is None:
+            return
+        size = len(self)
+        if size > self.max_entries:
+            self.conn.execute(
+                """DELETE FROM cleaned WHERE rowid IN (
+                    SELECT rowid FROM cleaned ORDER BY accessed LIMIT ?
+                )""",
+                (size - self.max_entries,)
+            )
+            self.conn.commit()
+
+    def clear(self, cleaner=None):
+        if cleaner:
+            self.conn.execute("DELETE FROM cleaned WHERE cleaner = ?", (cleaner,))
+            self.conn.execute("DELETE FROM columns WHERE cleaner = ?", (cleaner,))
+        else:
+            self.conn.execute("DELETE FROM cleaned")
+            self.conn.execute("DELETE FROM columns")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def _purge(self, cleaner, version):
+        """ 清除值处理规则变化前的旧版本条目
+        """
+        if (cleaner, version) in self.purged:
+            return
+        self.conn.execute(
+            "DELETE FROM cleaned WHERE cleaner = ? AND version != ?", (cleaner, version))
+        self.conn.execute(
+            "DELETE FROM columns WHERE cleaner = ? AND version != ?", (cleaner, version))
+        self.conn.commit()
+        self.purged.add((cleaner, version))
+
+    def _touch(self, cleaner, params, raws, now):
+        for i in range(0, len(raws), 500):
+            batch = raws[i:i+500]
+            self.conn.execute(
+                "UPDATE cleaned SET accessed = ? WHERE cleaner = ? AND params = ? AND raw IN ({})".format(
+                    ','.join('?' * len(batch))),
+                [now, cleaner, params] + batch
+            )
+        self.conn.commit()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM cleaned").fetchone()[0]
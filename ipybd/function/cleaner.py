@@ -1,3 +1,6 @@
+import functools
+import hashlib
+import inspect
 import json
 import os
 import re
@@ -7,17 +10,51 @@ from typing import Union
 import warnings
 
 import arrow
+import numpy as np
 import pandas as pd
 from tqdm import tqdm
 
+from ipybd.function.clean_cache import CleanCache
+from ipybd.function.reference import REFERENCES, load_reference
+
 
 PARENT_PATH = os.path.dirname(os.path.dirname(__file__))
 STD_OPTIONS_ALIAS_PATH = os.path.join(
     PARENT_PATH, 'lib', 'std_options_alias.json')
 ADMIN_DIV_LIB_PATH = os.path.join(PARENT_PATH, 'lib', 'chinese_admin_div.json')
 
+# 值处理类缺省使用的 CleanCache，由 set_clean_cache 设置
+CLEAN_CACHE = None
+
+# DateTime 支持的日期格式
+DATETIME_STYLES = ("num", "date", "datetime", "utc")
+
+# Kingdonia 等系统中表示无日期的写法
+NULL_DATETIMES = ["0000-01-01 00:00:02", "9999-01-01 00:00:00", "1970-01-01 00:00:00", "0000-01-01 00:00:00"]
+
+# DateTime 向量化处理的日期写法及其包含的年月日数值个数
+DATE_PATTERNS = (
+    (r"^([0-9]{4})[-/]([0-9]{1,2})[-/]([0-9]{1,2})\Z", 3),
+    (r"^([0-9]{4})([0-9]{2})([0-9]{2})\Z", 3),
+    (r"^([0-9]{4})[-/]([0-9]{1,2})\Z", 2),
+    (r"^([0-9]{4})\Z", 1)
+)
+DATETIME_PATTERN = r"^([0-9]{4})-([0-9]{2})-([0-9]{2})([T ])([0-9]{2}):([0-9]{2}):([0-9]{2})\Z"
 
-def ifunc(obj):
+# 不含 arrow 格式符的时区写法
+ZONE_PATTERN = re.compile(r"[0-9+\-:]*")
+
+
+def ifunc(obj=None, unique=False):
+    """ 将值处理类或函数转换为可以解析 ipybd 模型参数语义的功能类或函数
+
+    unique: 是否只处理数据列中不重复的值，参见 unique_values，
+            以 @ifunc(unique=True) 的方式启用
+    """
+    if obj is None:
+        return functools.partial(ifunc, unique=unique)
+    if unique:
+        obj = unique_values(obj)
     if isinstance(obj, (type, FunctionType)):
         def handler(*args, **kwargs):
             param = args[0]
@@ -41,7 +78,265 @@ def ifunc(obj):
         raise ValueError('model value error: {}'.format(obj))
 
 
-@ifunc
+def factorize_columns(columns):
+    """ 将一个或多个等长数据列的各行编码为不重复值（组）的序号
+
+    值的类型也参与比较，以免 1、1.0、True 等被视为同一个值
+
+    columns: 由数据列组成的列表
+    return: (各行的序号, 各不重复值首次出现的行号)，数据列含不可哈希的值时返回 None
+    """
+    codes = np.zeros(len(columns[0]), dtype=np.int64)
+    for column in columns:
+        values = pd.Series(list(column), dtype=object)
+        types = pd.Series([type(value) for value in values], dtype=object)
+        for part in (values, types):
+            try:
+                part_codes, uniques = pd.factorize(part)
+            except TypeError as e:
+                if 'unhashable' not in str(e):
+                    raise
+                return None
+            # 缺失值的序号为 -1，这里将其编为单独的一个值
+            part_codes = np.where(part_codes < 0, len(uniques), part_codes)
+            codes, _ = pd.factorize(codes * (len(uniques) + 1) + part_codes)
+    _, first = np.unique(codes, return_index=True)
+    return codes, first
+
+
+def _take(column, rows):
+    if isinstance(column, pd.Series):
+        return column.iloc[rows].reset_index(drop=True)
+    elif isinstance(column, np.ndarray):
+        return column[rows]
+    values = [column[i] for i in rows]
+    return tuple(values) if isinstance(column, tuple) else values
+
+
+def _scatter(result, codes, size, index):
+    """ 将基于不重复值的处理结果按 codes 还原为原数据列各行的结果
+    """
+    if isinstance(result, tuple):
+        return tuple(_scatter(r, codes, size, index) for r in result)
+    elif isinstance(result, dict):
+        return {k: _scatter(v, codes, size, index) for k, v in result.items()}
+    try:
+        if len(result) != size:
+            return result
+    except TypeError:
+        return result
+    if isinstance(result, (pd.Series, pd.DataFrame)):
+        result = result.iloc[codes]
+        result.index = index
+        return result
+    elif isinstance(result, np.ndarray):
+        return result[codes]
+    elif isinstance(result, list):
+        return [result[c] for c in codes]
+    return result
+
+
+def _unique_args(args, always=False):
+    """ 将参数中的数据列替换为其不重复的值（组）
+
+    args 中与第一个参数等长的 list、tuple、Series、ndarray 被视为数据列，
+    其余参数原样保留
+
+    always: 数据列不含重复值时是否仍然返回结果
+    return: (替换后的参数, 各行的序号, 不重复值的个数, 原数据列的 index, 数据列在
+            args 中的位置)，数据列不含重复值或者含不可哈希的值时返回 None
+    """
+    if not args or not isinstance(args[0], (list, tuple, pd.Series, np.ndarray)):
+        return None
+    size = len(args[0])
+    columns = [
+        n for n, arg in enumerate(args)
+        if isinstance(arg, (list, tuple, pd.Series, np.ndarray)) and len(arg) == size
+    ]
+    factorized = factorize_columns([args[n] for n in columns])
+    if factorized is None or (len(factorized[1]) == size and not always):
+        return None
+    codes, first = factorized
+    index = args[0].index if isinstance(args[0], pd.Series) else pd.RangeIndex(size)
+    args = list(args)
+    for n in columns:
+        args[n] = _take(args[n], first)
+    return args, codes, len(first), index, columns
+
+
+def unique_values(obj):
+    """ 使值处理类或函数只处理数据列中不重复的值（组），再将结果还原至各行
+
+    标本数据中同一采集日期、经纬度、海拔等往往重复成千上万次，经过修饰的
+    类或函数对每个不重复的值只处理一次；多个数据列（如 Number 的最小值、
+    最大值）按各行的值组合去重。只适用于各行结果仅取决于该行数据的类或函数，
+    UniqueID、FillNa 等需要比较多行数据的类不能使用。
+
+    obj: 值处理类，其实例被调用后需返回与数据列等长的 DataFrame；
+         或者函数，需返回与数据列等长的 Series、DataFrame、list、ndarray
+         或者由它们组成的 tuple、dict
+    """
+    if isinstance(obj, type):
+        return type(obj.__name__, (UniqueValues,), {
+            'cleaner': obj,
+            '__doc__': obj.__doc__,
+            '__module__': obj.__module__,
+            '__qualname__': obj.__qualname__
+        })
+    elif isinstance(obj, FunctionType):
+        @functools.wraps(obj)
+        def wrapper(*args, **kwargs):
+            unique = _unique_args(args)
+            if unique is None:
+                return obj(*args, **kwargs)
+            args, codes, count, index, _ = unique
+            return _scatter(obj(*args, **kwargs), codes, count, index)
+        return wrapper
+    else:
+        raise ValueError('model value error: {}'.format(obj))
+
+
+class UniqueValues:
+    """ unique_values 修饰值处理类时生成的类的基类
+
+    实例化时只记录参数，被调用时以不重复的值实例化原来的类并调用，再将返回
+    的 DataFrame 还原至各行；其他属性和方法由以原参数实例化的原类提供。
+
+    实例化时可以传入 cache 参数（CleanCache 实例或 SQLite 文件路径），或者通过
+    set_clean_cache 设置缺省的 CleanCache，之前处理过的值将直接读取缓存的结果。
+    原类可以定义 _frame(rows) 方法，由各行结果生成 DataFrame，缺省按列名生成。
+    原类的 cache_files 属性为其依赖的参考数据文件，这些文件与原类所在的源文件
+    一同决定缓存的版本。
+    """
+    cleaner = None
+
+    def __init__(self, *args, cache=None, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        if isinstance(cache, str):
+            cache = CleanCache(cache)
+        self.cache = cache
+
+    def __getattr__(self, name):
+        if name.startswith('__') or name in ('args', 'kwargs', 'cache', 'instance'):
+            raise AttributeError(name)
+        if 'instance' not in self.__dict__:
+            self.instance = self.cleaner(*self.args, **self.kwargs)
+        return getattr(self.instance, name)
+
+    def __call__(self, *args, **kwargs):
+        cache = self.cache if self.cache is not None else CLEAN_CACHE
+        version = _cleaner_version(self.cleaner) if cache is not None else None
+        if version is None:
+            # 无法获取源代码的值处理类（如在交互式解释器中定义的类）不使用缓存
+            cache = None
+        unique = _unique_args(self.args, always=cache is not None)
+        if unique is None:
+            return self.cleaner(*self.args, **self.kwargs)(*args, **kwargs)
+        if cache is None:
+            columns, codes, _, _, _ = unique
+            result = self.cleaner(*columns, **self.kwargs)(*args, **kwargs)
+        else:
+            result, codes = self._cached_call(cache, version, unique, args, kwargs)
+        return result.iloc[codes].reset_index(drop=True)
+
+    def _cached_call(self, cache, version, unique, args, kwargs):
+        """ 先读取各不重复值的缓存结果，只处理未缓存的值
+
+        return: (不重复值的处理结果, 各行的序号)
+        """
+        values, codes, count, _, positions = unique
+        name = self.cleaner.__name__
+        params = json.dumps([
+            [None if n in positions else arg for n, arg in enumerate(values)],
+            self.kwargs, args, kwargs
+        ], sort_keys=True, ensure_ascii=False, default=repr)
+        raws = [
+            json.dumps([[type(values[n][i]).__name__, values[n][i]] for n in positions],
+                       ensure_ascii=False, default=str)
+            for i in range(count)
+        ]
+        hits, columns = cache.get(name, params, version, raws)
+        misses = [i for i, raw in enumerate(raws) if raw not in hits]
+        rows = [hits.get(raw) for raw in raws]
+        if misses:
+            missed = list(values)
+            for n in positions:
+                missed[n] = _take(values[n], misses)
+            instance = self.cleaner(*missed, **self.kwargs)
+            frame = instance(*args, **kwargs)
+            columns = list(frame.columns)
+            for i, row in zip(misses, _frame_rows(frame)):
+                rows[i] = row
+            cache.set(name, params, version, {raws[i]: rows[i] for i in misses}, columns)
+        else:
+            instance = self.cleaner(*values, **self.kwargs)
+        if hasattr(instance, '_frame'):
+            return instance._frame(rows), codes
+        return pd.DataFrame(rows, columns=columns), codes
+
+
+def _frame_rows(frame):
+    """ 将 DataFrame 转换为可以被 json 序列化的各行的值，空值统一为 None
+    """
+    rows = []
+    for row in frame.astype(object).itertuples(index=False):
+        cells = []
+        for cell in row:
+            if isinstance(cell, np.generic):
+                cell = cell.item()
+            if not isinstance(cell, (list, tuple, dict)) and pd.isnull(cell):
+                cell = None
+            cells.append(cell)
+        rows.append(cells)
+    return rows
+
+
+# 源文件和参考数据文件的摘要，key 为 (路径, 修改时间, 大小)
+_FILE_DIGESTS = {}
+
+
+def _cleaner_version(cleaner):
+    """ 由值处理类所在源文件及其 cache_files 的内容生成值处理规则的版本
+
+    值处理类不在源文件中时（如在 Jupyter 中定义），以其源代码生成版本；
+    无法获取源代码时（如在交互式解释器中定义）返回 None
+    """
+    digest = hashlib.sha1()
+    try:
+        source = inspect.getsourcefile(cleaner)
+    except TypeError:
+        source = None
+    if source is None or not os.path.isfile(source):
+        try:
+            digest.update(inspect.getsource(cleaner).encode())
+        except (OSError, TypeError):
+            return None
+        paths = []
+    else:
+        paths = [source]
+    for path in paths + list(getattr(cleaner, 'cache_files', ())):
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        if key not in _FILE_DIGESTS:
+            with open(path, 'rb') as f:
+                _FILE_DIGESTS[key] = hashlib.sha1(f.read()).hexdigest()
+        digest.update(_FILE_DIGESTS[key].encode())
+    return digest.hexdigest()
+
+
+def set_clean_cache(cache):
+    """ 设置值处理类缺省使用的 CleanCache
+
+    cache: CleanCache 实例或 SQLite 文件路径，为 None 时不再使用缓存
+    """
+    global CLEAN_CACHE
+    if isinstance(cache, str):
+        cache = CleanCache(cache)
+    CLEAN_CACHE = cache
+
+
+@ifunc(unique=True)
 class DateTime:
     def __init__(self, date_time: Union[list, pd.Series, tuple], style="num", timezone='+08:00'):
         self.datetime = date_time
@@ -50,63 +345,177 @@ class DateTime:
         self.style = style
 
     def format_datetime(self, style):
-        result = []
-        for n, date_time in enumerate(tqdm(self.datetime, desc="日期处理", ascii=True)):
+        if style not in DATETIME_STYLES:
+            return self._format_rows(style)
+        values = list(self.datetime)
+        result = [None] * len(values)
+        # 相同的原始值只处理一次，key 带上类型以免 1、1.0、True 等被视为同一个值
+        groups = {}
+        for n, date_time in enumerate(values):
             # 兼容 Kingdonia 无日期写法
             # 遇到无日期的写法,直接将原始数据置为空
-            if date_time in ["0000-01-01 00:00:02", "9999-01-01 00:00:00", "1970-01-01 00:00:00", "0000-01-01 00:00:00"]:
+            if date_time in NULL_DATETIMES:
                 self.datetime[n] = None
-                result.append(None)
                 continue
-            # 先尝试作为 datetime 处理
-            datetime = self.datetime_valid(date_time)
-            if datetime:
-                if style == "datetime":
-                    result.append(datetime.format("YYYY-MM-DD HH:mm:ss"))
-                elif style == "utc":
-                    result.append(
-                        datetime.format(
-                            "YYYY-MM-DDTHH:mm:ss" +
-                            self.zone))
-                else:
-                    result.append(
-                        self.__format_date_style(
-                            datetime.year,
-                            datetime.month,
-                            datetime.day,
-                            style
-                        )
-                    )
+            try:
+                groups.setdefault((type(date_time), date_time), []).append(n)
+            except TypeError:
+                result[n] = self._format_value(date_time, style)
+        uniques = [key[1] for key in groups]
+        formatted = self._format_uniques(uniques, style)
+        for rows, value in zip(groups.values(), formatted):
+            for n in rows:
+                result[n] = value
+        return result
+
+    def _format_uniques(self, uniques, style):
+        """ 先以向量化的方式处理常见写法的日期，其余的再逐个处理
+
+        uniques: 不重复的原始日期
+        return: 与 uniques 一一对应的处理结果
+        """
+        formatted = [None] * len(uniques)
+        strings = [n for n, date_time in enumerate(uniques) if type(date_time) is str]
+        fast = self._vectorized_format(
+            pd.Series([uniques[n] for n in strings], dtype=object), style)
+        rest = []
+        for n, value in zip(strings, fast):
+            if value is None:
+                rest.append(n)
             else:
-                # 然后尝试作为 date 进行处理
-                try:
-                    date_degree, date_elements = self.get_date_elements(
-                        date_time)
-                except TypeError:
-                    result.append(None)
-                    continue
-                # 获取单个日期的年月日值，如果单个日期的年月日值有不同的拼写法，则全部转换成整型
-                date_elements = self.mapping_date_element(
-                    date_degree, date_elements)
-                if date_elements:
-                    # 判断年月日的数值是否符合规范&判断各数值是 年 月 日 中的哪一个
-                    try:
-                        year, month, day = self.format_date_elements(
-                            date_degree,
-                            date_elements)
-                        result.append(
-                            self.__format_date_style(
-                                year, month, day, style))
-                    except TypeError:
-                        result.append(None)
-                        continue
-                    except ValueError:
-                        print("\n\n style 参数指定不正确\n")
-                        break
-                else:
-                    result.append(None)
-                    continue
+                formatted[n] = value
+        strings = set(strings)
+        rest.extend(n for n in range(len(uniques)) if n not in strings)
+        for n in tqdm(rest, desc="日期处理", ascii=True):
+            formatted[n] = self._format_value(uniques[n], style)
+        return formatted
+
+    def _vectorized_format(self, values, style):
+        """ 以 pandas 向量化处理 YYYY-MM-DD、YYYY/M/D、YYYYMMDD、YYYY-MM、YYYY
+            和 YYYY-MM-DD HH:mm:ss 等常见写法的日期
+
+        只处理结果能够确定与 _format_value 相同的日期，如年份在 1600 年至今、
+        月日数值合法且不晚于今天的日期，其余的交由 _format_value 处理
+
+        values: 由不重复的字符串日期组成的 Series
+        return: 与 values 对应的 Series，未处理的日期为 None
+        """
+        result = pd.Series(None, index=values.index, dtype=object)
+        if values.empty:
+            return result
+        today = date.today()
+        year = pd.Series(float('nan'), index=values.index)
+        month = year.copy()
+        day = year.copy()
+        degree = pd.Series(0, index=values.index)
+        for pattern, date_degree in DATE_PATTERNS:
+            elements = values.str.extract(pattern).astype(float)
+            matched = elements[0].notna()
+            year[matched] = elements.loc[matched, 0]
+            if date_degree > 1:
+                month[matched] = elements.loc[matched, 1]
+            if date_degree > 2:
+                day[matched] = elements.loc[matched, 2]
+            degree[matched] = date_degree
+        # 带时间的日期，arrow 能够解析且小时数不为 0 时按 datetime 处理，
+        # 否则与 YYYY-MM-DD 相同，按 date 处理
+        stamps = values.str.extract(DATETIME_PATTERN)
+        stamp_date = stamps[0] + '-' + stamps[1] + '-' + stamps[2]
+        stamp_time = stamps[4] + ':' + stamps[5] + ':' + stamps[6]
+        elements = stamps.drop(columns=3).astype(float)
+        parsed = pd.to_datetime(stamp_date, format='%Y-%m-%d', errors='coerce').notna()
+        parsed &= (elements[0] > 999) & (elements[4] < 24) & (elements[5] < 60) & (elements[6] < 60)
+        timed = parsed & (elements[4] > 0)
+        # 以 T 分隔的日期和时间会被 get_date_elements 拆出字母元素而无法处理
+        untimed = parsed & (elements[4] == 0) & (stamps[3] == ' ')
+        for series, k in ((year, 0), (month, 1), (day, 2)):
+            series[timed | untimed] = elements.loc[timed | untimed, k]
+        degree[untimed] = 3
+
+        valid_year = year.between(1600, today.year)
+        full = (degree == 3) & valid_year & month.between(1, 12) & day.between(1, 31)
+        if full.any():
+            dates = pd.to_datetime(
+                pd.DataFrame({'year': year[full], 'month': month[full], 'day': day[full]}),
+                errors='coerce')
+            full[full] = dates.notna() & (dates <= pd.Timestamp(today))
+        no_day = (degree == 2) & valid_year & month.between(1, 12)
+        no_month = (degree == 1) & valid_year
+
+        years = year.fillna(0).astype(int).astype(str)
+        months = month.fillna(0).astype(int).astype(str)
+        days = day.fillna(0).astype(int).astype(str)
+        if style in ("num", "date"):
+            full = full | timed
+        if style == "num":
+            result[full] = years + months.str.zfill(2) + days.str.zfill(2)
+            result[no_day] = years + months.str.zfill(2) + "00"
+            result[no_month] = years + "0000"
+        elif style == "date":
+            result[full] = years + "-" + months + "-" + days
+            result[no_day] = years + "-" + months + "-01"
+            result[no_month] = years + "-01-01"
+        elif style == "datetime":
+            result[full] = years + "-" + months + "-" + days + " 00:00:00"
+            result[no_day] = years + "-" + months + "-01 00:00:01"
+            result[no_month] = years + "-01-01 00:00:02"
+            result[timed] = stamp_date + " " + stamp_time
+        else:
+            result[full] = years + "-" + months.str.zfill(2) + "-" + days.str.zfill(2) + "T00:00:00" + self.zone
+            result[no_day] = years + "-" + months.str.zfill(2) + "-01T00:00:01" + self.zone
+            result[no_month] = years + "-01-01T00:00:02" + self.zone
+            # arrow 会将时区中的字母视为格式符，这种时区交由 arrow 处理
+            if ZONE_PATTERN.fullmatch(self.zone):
+                result[timed] = stamp_date + "T" + stamp_time + self.zone
+        return result.where(result.notna(), None)
+
+    def _format_value(self, date_time, style):
+        """ 逐个处理单个日期，先尝试作为 datetime 处理，然后尝试作为 date 处理
+        """
+        datetime = self.datetime_valid(date_time)
+        if datetime:
+            if style == "datetime":
+                return datetime.format("YYYY-MM-DD HH:mm:ss")
+            elif style == "utc":
+                return datetime.format("YYYY-MM-DDTHH:mm:ss" + self.zone)
+            else:
+                return self.__format_date_style(
+                    datetime.year,
+                    datetime.month,
+                    datetime.day,
+                    style
+                )
+        try:
+            date_degree, date_elements = self.get_date_elements(date_time)
+        except TypeError:
+            return None
+        # 获取单个日期的年月日值，如果单个日期的年月日值有不同的拼写法，则全部转换成整型
+        date_elements = self.mapping_date_element(date_degree, date_elements)
+        if not date_elements:
+            return None
+        # 判断年月日的数值是否符合规范&判断各数值是 年 月 日 中的哪一个
+        try:
+            year, month, day = self.format_date_elements(
+                date_degree,
+                date_elements)
+        except TypeError:
+            return None
+        return self.__format_date_style(year, month, day, style)
 
+    def _format_rows(self, style):
+        """ style 不正确时逐行处理，保持原有的报错方式
+        """
+        result = []
+        for n, date_time in enumerate(self.datetime):
+            if date_time in NULL_DATETIMES:
+                self.datetime[n] = None
+                result.append(None)
+                continue
+            try:
+                result.append(self._format_value(date_time, style))
+            except ValueError:
+                print("\n\n style 参数指定不正确\n")
+                break
         return result
 
     def datetime_valid(self, datetime):
@@ -363,7 +772,7 @@ class DateTime:
         return pd.DataFrame({"dateTime": std_datetime})
 
 
-@ifunc
+@ifunc(unique=True)
 class HumanName:
     def __init__(self, names: Union[list, pd.Series, tuple], separator='，'):
         self.names = names
@@ -450,7 +859,41 @@ class HumanName:
         return pd.DataFrame(pd.Series(self.format_names()))
 
 
-@ifunc
+class AdminDivIndex:
+    """ 标准行政区划的二字索引
+
+    AdminDiv._build_mapping 只有在标准行政区中找到 "::" + 原始地名中相邻的
+    两个字时才会为其计分，其余标准行政区不影响匹配结果。索引以标准行政区中
+    每个 "::" 之后的两个字为 key，记录含有该 key 的标准行政区的序号，匹配时只
+    需按原有顺序比对由原始地名各相邻两字取得的候选行政区，结果与逐个比对
+    全部标准行政区相同。同一进程中通过 load_reference 只构建一次。
+    """
+
+    def __init__(self, regions):
+        """
+        regions: 由 "::" 分隔的标准行政区组成的列表
+        """
+        self.regions = regions
+        self.keys = {}
+        for n, region in enumerate(regions):
+            start = region.find("::")
+            while start != -1:
+                positions = self.keys.setdefault(region[start+2:start+4], [])
+                if not positions or positions[-1] != n:
+                    positions.append(n)
+                start = region.find("::", start + 1)
+
+    def candidates(self, raw_region):
+        """ 返回可能与原始地名匹配的标准行政区，顺序与标准行政区列表一致
+        """
+        region = raw_region.rstrip(":")
+        positions = set()
+        for i in range(len(region) - 1):
+            positions.update(self.keys.get(region[i:i+2], ()))
+        return [self.regions[n] for n in sorted(positions)]
+
+
+@ifunc(unique=True)
 class AdminDiv:
     """中国省市县行政区匹配
 
@@ -466,6 +909,7 @@ class AdminDiv:
     “中国,四川省”，对于字数一致的，则匹配短的行政区，但会标识，如后者可能匹配
     “!中国,云南省”
     """
+    cache_files = [ADMIN_DIV_LIB_PATH]
 
     def __init__(self, address: Union[list, pd.Series, tuple]):
         self.org_address = address
@@ -473,13 +917,12 @@ class AdminDiv:
 
     def format_chinese_admindiv(self):
         new_regions = []
-        with open(ADMIN_DIV_LIB_PATH, 'r', encoding='utf-8') as ad:
-            std_regions = json.load(ad)
+        index = load_reference(ADMIN_DIV_LIB_PATH, AdminDivIndex)
         # country_split = re.compile(r"([\s\S]*?)::([\s\S]*)")
         for raw_region in tqdm(self.region_mapping, desc="行政区划", ascii=True):
             if pd.isnull(raw_region):
                 continue
-            self._build_mapping(raw_region, std_regions)
+            self._build_mapping(raw_region, index.candidates(raw_region))
         new_regions = [
             (
                 self.region_mapping[region].split("::")
@@ -562,7 +1005,7 @@ class AdminDiv:
                             })
 
 
-@ifunc
+@ifunc(unique=True)
 class Number:
     def __init__(self, min_column: Union[list, pd.Series, tuple], max_column: Union[list, pd.Series, tuple] = None,
                  typ=float, min_num=-423, max_num=8848):
@@ -681,7 +1124,9 @@ class Number:
         return [[i, j] for i, j in zip(min_column, max_column)]
 
     def __call__(self, mark=True):
-        new_column = self.format_number(mark)
+        return self._frame(self.format_number(mark))
+
+    def _frame(self, new_column):
         if self.typ is int:
             # 解决含 None 数据列，pandas 会将int数据列转换为float的问题
             # 这里要求 pandas 版本支持
@@ -697,7 +1142,7 @@ class Number:
             return pd.DataFrame(new_column)
 
 
-@ifunc
+@ifunc(unique=True)
 class GeoCoordinate:
     def __init__(self, coordinates: Union[list, pd.Series, tuple]):
         self.coordinates = coordinates
@@ -879,16 +1324,19 @@ class GeoCoordinate:
 
 @ifunc
 class RadioInput:
+    # 处理结果取决于交互输入，手动忽略或者标记的值不能被缓存，因此逐行处理，
+    # 不使用不重复值处理和 CleanCache
     def __init__(self, column, lib=None):
         self.column = column
         if isinstance(lib, dict):
             self.rewritelib = 0
             self.std2alias = lib
         elif isinstance(lib, str):
-            with open(STD_OPTIONS_ALIAS_PATH, "r", encoding="utf-8") as o:
-                self.lib = json.load(o)
-                self.rewritelib = 1
-                self.std2alias = self.lib[lib]
+            # self.lib 为进程内共用的解析结果，只复制可能被补充别名的选值库
+            self.lib = load_reference(STD_OPTIONS_ALIAS_PATH)
+            self.lib_name = lib
+            self.rewritelib = 1
+            self.std2alias = {k: list(v) for k, v in self.lib[lib].items()}
         else:
             raise ValueError('unvalid lib!')
 
@@ -940,8 +1388,11 @@ class RadioInput:
                             except BaseException:
                                 print("\n输入的字符有误...\n")
                 if self.rewritelib:
+                    lib = dict(self.lib)
+                    lib[self.lib_name] = std2alias
                     with open(STD_OPTIONS_ALIAS_PATH, "w", encoding="utf-8") as f:
-                        f.write(json.dumps(self.lib, ensure_ascii=False))
+                        f.write(json.dumps(lib, ensure_ascii=False))
+                    REFERENCES.invalidate(STD_OPTIONS_ALIAS_PATH)
 
         return [options_mapping[w] for w in self.column]
 
@@ -983,7 +1434,7 @@ class FillNa:
         return self.df.fillna(value=self.value, method=self.method, axis=self.axis, inplace=False, limit=self.limit, downcast=self.downcast)
 
 
-@ifunc
+@ifunc(unique=True)
 class Url:
     def __init__(self, column: Union[list, pd.Series, tuple]):
         self.urls = column
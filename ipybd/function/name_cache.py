@@ -0,0 +1,391 @@
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+
+
+DAY = 86400
+
+# 各平台检索结果在本地缓存中的默认有效期（秒）
+# 名称的分类处理会随时间更新，因此缓存不宜永久有效
+DEFAULT_TTL = {
+    'ipni': 90 * DAY,
+    'powo': 30 * DAY,
+    'col': 30 * DAY,
+    'tropicosName': 30 * DAY,
+    'tropicosAccepted': 30 * DAY,
+    'tropicosSynonyms': 30 * DAY,
+    # stdName 各检索词选定结果的平台
+    'stdName': 30 * DAY,
+    # 属、科一级的分类阶元
+    'colTaxa': 90 * DAY
+}
+
+# 平台明确返回查无结果的检索词，其缓存的默认有效期（秒）
+# 这类名称多为拼写错误或者仅见于标本馆的名称，有效期应短于正常结果
+DEFAULT_NEGATIVE_TTL = 7 * DAY
+
+# 网络请求失败的检索词，在该时间（秒）内不再重复请求，过期后重新检索
+DEFAULT_FAILURE_TTL = 600
+
+
+def base_platform(platform):
+    """ 去除 BioName 附加在平台名称后的检索来源，如 "col@col=http://127.0.0.1:8001/col"
+    """
+    return platform.split('@', 1)[0]
+
+
+class NameCache:
+    """ 学名检索结果的本地持久化缓存
+
+    以 SQLite 文件存储 BioName 各平台的检索结果，缓存的 key 由平台名称和
+    规范化的检索词组成，每个平台可以单独设置缓存的有效期，缓存条目超过
+    max_entries 后，最久未被使用的条目会被优先清除。
+
+    平台明确查无结果的检索词以 None 作为结果缓存，并使用单独的、较短的有效期；
+    网络请求失败的检索词则单独记录，仅在 failure_ttl 内不再重复请求，不会被
+    当作查无结果处理。
+    """
+
+    def __init__(self, path, ttl=None, max_entries=1000000,
+                 negative_ttl=DEFAULT_NEGATIVE_TTL, failure_ttl=DEFAULT_FAILURE_TTL):
+        """
+        path: SQLite 缓存文件路径
+        ttl: 缓存有效期（秒），可以是数值，也可以是 平台:有效期 组成的字典，
+             有效期为 None 的平台，缓存永久有效
+        max_entries: 缓存的最大条目数
+        negative_ttl: 查无结果的缓存有效期（秒），可以是数值或字典，为 0 则不缓存
+        failure_ttl: 请求失败的检索词暂停重试的时间（秒），为 0 则不记录
+        """
+        self.path = path
+        self.ttl = dict(DEFAULT_TTL)
+        if isinstance(ttl, dict):
+            self.ttl.update(ttl)
+        elif ttl is not None:
+            self.ttl = dict.fromkeys(self.ttl, ttl)
+        if isinstance(negative_ttl, dict):
+            self.negative_ttl = dict.fromkeys(self.ttl, DEFAULT_NEGATIVE_TTL)
+            self.negative_ttl.update(negative_ttl)
+        else:
+            self.negative_ttl = dict.fromkeys(self.ttl, negative_ttl)
+        self.failure_ttl = failure_ttl
+        self.max_entries = max_entries
+        directory = os.path.dirname(os.path.abspath(path))
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS names (
+                platform TEXT NOT NULL,
+                query TEXT NOT NULL,
+                result TEXT,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                PRIMARY KEY (platform, query)
+            )"""
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS names_accessed ON names (accessed)")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS failures (
+                action TEXT NOT NULL,
+                query TEXT NOT NULL,
+                created REAL NOT NULL,
+                PRIMARY KEY (action, query)
+            )"""
+        )
+        self.conn.commit()
+
+    def get(self, platform, keys):
+        """ 批量读取某一平台的缓存
+
+        platform: 平台名称，与 BioName.cache 的 key 一致
+        keys: 规范化检索词组成的可迭代对象
+
+        return: 由 检索词:检索结果 组成的字典，过期和不存在的检索词不包含其中，
+                查无结果的检索词，其检索结果为 None
+        """
+        keys = list(set(keys))
+        now = time.time()
+        ttl = self.ttl.get(base_platform(platform))
+        negative_ttl = self.negative_ttl.get(base_platform(platform), DEFAULT_NEGATIVE_TTL)
+        results = {}
+        # SQLite 对单条语句的参数个数有限制，这里分批查询
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i+500]
+            rows = self.conn.execute(
+                "SELECT query, result, created FROM names WHERE platform = ? AND query IN ({})".format(
+                    ','.join('?' * len(batch))),
+                [platform] + batch
+            ).fetchall()
+            for query, result, created in rows:
+                result = json.loads(result)
+                if result is None:
+                    if negative_ttl is not None and now - created > negative_ttl:
+                        continue
+                elif ttl is not None and now - created > ttl:
+                    continue
+                results[query] = result
+        if results:
+            self._touch(platform, list(results), now)
+        return results
+
+    def set(self, platform, items):
+        """ 批量写入某一平台的检索结果
+
+        items: 由 检索词:检索结果 组成的字典，检索结果须可以被 json 序列化，
+               查无结果的检索词，其检索结果为 None
+        """
+        if not self.negative_ttl.get(base_platform(platform), DEFAULT_NEGATIVE_TTL):
+            items = {query: result for query, result in items.items() if result is not None}
+        if not items:
+            return
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO names VALUES (?, ?, ?, ?, ?)",
+            [
+                (platform, query, json.dumps(result, ensure_ascii=False), now, now)
+                for query, result in items.items()
+            ]
+        )
+        self.conn.commit()
+        self.evict()
+
+    def failed(self, action, keys):
+        """ 获取 failure_ttl 内请求失败过的检索词
+
+        return: 由检索词组成的集合
+        """
+        if not self.failure_ttl:
+            return set()
+        keys = list(set(keys))
+        since = time.time() - self.failure_ttl
+        failed = set()
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i+500]
+            rows = self.conn.execute(
+                "SELECT query FROM failures WHERE action = ? AND created > ? AND query IN ({})".format(
+                    ','.join('?' * len(batch))),
+                [action, since] + batch
+            ).fetchall()
+            failed.update(row[0] for row in rows)
+        return failed
+
+    def set_failed(self, action, keys):
+        """ 记录请求失败的检索词，并清除已经过期的失败记录
+        """
+        keys = set(keys)
+        if not keys or not self.failure_ttl:
+            return
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO failures VALUES (?, ?, ?)",
+            [(action, query, now) for query in keys]
+        )
+        self.conn.execute(
+            "DELETE FROM failures WHERE created < ?", (now - self.failure_ttl,))
+        self.conn.commit()
+
+    def evict(self):
+        """ 缓存超出 max_entries 时，清除最久未使用的条目
+        """
+        if self.max_entries is None:
+            return
+        size = self.conn.execute("SELECT COUNT(*) FROM names").fetchone()[0]
+        if size > self.max_entries:
+            self.conn.execute(
+                """DELETE FROM names WHERE rowid IN (
+                    SELECT rowid FROM names ORDER BY accessed LIMIT ?
+                )""",
+                (size - self.max_entries,)
+            )
+            self.conn.commit()
+
+    def clear(self, platform=None):
+        if platform:
+            self.conn.execute("DELETE FROM names WHERE platform = ?", (platform,))
+        else:
+            self.conn.execute("DELETE FROM names")
+            self.conn.execute("DELETE FROM failures")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def _touch(self, platform, keys, now):
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i+500]
+            self.conn.execute(
+                "UPDATE names SET accessed = ? WHERE platform = ? AND query IN ({})".format(
+                    ','.join('?' * len(batch))),
+                [now, platform] + batch
+            )
+        self.conn.commit()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM names").fetchone()[0]
+
+
+class NameCheckpoint:
+    """ 学名批量检索任务的检查点
+
+    以 JSON Lines 文件逐批追加记录已经完成的检索结果，任务中断后重新执行时，
+    已经记录的检索词不再检索。与 NameCache 不同，检查点没有有效期，也不记录
+    请求失败的检索词，失败的检索词在重新执行时会再次检索。
+    """
+
+    def __init__(self, path):
+        """
+        path: 检查点文件路径，文件已存在时读取其中的检索结果
+        """
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # 写入过程中被中断的最后一行
+                        continue
+                    self.entries.setdefault(record['platform'], {}).update(record['items'])
+        else:
+            directory = os.path.dirname(os.path.abspath(path))
+            if not os.path.exists(directory):
+                os.makedirs(directory)
+
+    def get(self, platform, keys):
+        entries = self.entries.get(platform, {})
+        return {key: entries[key] for key in keys if key in entries}
+
+    def set(self, platform, items):
+        if not items:
+            return
+        self.entries.setdefault(platform, {}).update(items)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'platform': platform, 'items': items}, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def failed(self, action, keys):
+        return set()
+
+    def set_failed(self, action, keys):
+        pass
+
+    def clear(self):
+        self.entries = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self.entries.values())
+
+
+class MemoryNameCache:
+    """ 进程内的学名检索结果缓存
+
+    接口与 NameCache 一致，供长期运行的 NameServer 在多次检索之间共享检索结果，
+    有效期的设置与 NameCache 相同，各平台的缓存条目超过 max_entries 后，最久
+    未被使用的条目会被优先清除。设置 backend 后，内存中不存在的检索词会再从
+    backend 中读取，写入的结果也会同时写入 backend。
+    """
+
+    def __init__(self, backend=None, ttl=None, max_entries=1000000,
+                 negative_ttl=DEFAULT_NEGATIVE_TTL, failure_ttl=DEFAULT_FAILURE_TTL):
+        """
+        backend: 可选的 NameCache 等持久化缓存
+        max_entries: 每个平台在内存中缓存的最大条目数
+        其余参数同 NameCache
+        """
+        self.backend = backend
+        self.ttl = dict(DEFAULT_TTL)
+        if isinstance(ttl, dict):
+            self.ttl.update(ttl)
+        elif ttl is not None:
+            self.ttl = dict.fromkeys(self.ttl, ttl)
+        if isinstance(negative_ttl, dict):
+            self.negative_ttl = dict.fromkeys(self.ttl, DEFAULT_NEGATIVE_TTL)
+            self.negative_ttl.update(negative_ttl)
+        else:
+            self.negative_ttl = dict.fromkeys(self.ttl, negative_ttl)
+        self.failure_ttl = failure_ttl
+        self.max_entries = max_entries
+        # 平台:{检索词:(检索结果, 写入时间)}
+        self.entries = {}
+        # (action, 检索词):请求失败的时间
+        self.failures = {}
+
+    def get(self, platform, keys):
+        now = time.time()
+        ttl = self.ttl.get(base_platform(platform))
+        negative_ttl = self.negative_ttl.get(base_platform(platform), DEFAULT_NEGATIVE_TTL)
+        entries = self.entries.setdefault(platform, OrderedDict())
+        results = {}
+        missing = []
+        for key in set(keys):
+            entry = entries.get(key)
+            if entry is not None:
+                result, created = entry
+                limit = negative_ttl if result is None else ttl
+                if limit is None or now - created <= limit:
+                    entries.move_to_end(key)
+                    results[key] = result
+                    continue
+                del entries[key]
+            missing.append(key)
+        if missing and self.backend is not None:
+            stored = self.backend.get(platform, missing)
+            self._put(platform, stored, now)
+            results.update(stored)
+        return results
+
+    def set(self, platform, items):
+        if not self.negative_ttl.get(base_platform(platform), DEFAULT_NEGATIVE_TTL):
+            items = {query: result for query, result in items.items() if result is not None}
+        if not items:
+            return
+        self._put(platform, items, time.time())
+        if self.backend is not None:
+            self.backend.set(platform, items)
+
+    def failed(self, action, keys):
+        if not self.failure_ttl:
+            return set()
+        since = time.time() - self.failure_ttl
+        failed = {key for key in keys if self.failures.get((action, key), 0) > since}
+        if self.backend is not None:
+            failed |= self.backend.failed(action, keys)
+        return failed
+
+    def set_failed(self, action, keys):
+        keys = set(keys)
+        if not keys or not self.failure_ttl:
+            return
+        now = time.time()
+        for key in keys:
+            self.failures[(action, key)] = now
+        since = now - self.failure_ttl
+        self.failures = {key: created for key, created in self.failures.items() if created > since}
+        if self.backend is not None:
+            self.backend.set_failed(action, keys)
+
+    def clear(self, platform=None):
+        if platform:
+            self.entries.pop(platform, None)
+        else:
+            self.entries = {}
+            self.failures = {}
+
+    def _put(self, platform, items, now):
+        entries = self.entries.setdefault(platform, OrderedDict())
+        for key, result in items.items():
+            entries[key] = (result, now)
+            entries.move_to_end(key)
+        if self.max_entries is not None:
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self.entries.values())
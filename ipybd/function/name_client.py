@@ -0,0 +1,94 @@
+import asyncio
+from urllib.parse import urlsplit
+
+import aiohttp
+
+
+# 每次提交的学名数量和同时提交的批数
+CLIENT_BATCH = 2000
+CLIENT_CONCURRENCY = 4
+
+
+class NameServerError(Exception):
+    """ 无法连接 NameServer 或者服务返回错误
+    """
+
+
+class NameServerClient:
+    """ NameServer 的客户端，由 BioName 调用
+    """
+
+    def __init__(self, address, batch=CLIENT_BATCH, concurrency=CLIENT_CONCURRENCY, timeout=None):
+        """
+        address: 服务地址，如 http://127.0.0.1:8730 或 unix:///tmp/ipybd-names.sock
+        batch: 每次提交的学名数量
+        concurrency: 同时提交的批数
+        timeout: 每批检索的超时时间（秒），缺省时不限制
+        """
+        parts = urlsplit(address)
+        if parts.scheme == 'unix':
+            self.path = parts.path
+            self.base = 'http://localhost'
+        else:
+            self.path = None
+            self.base = address.rstrip('/')
+        self.address = address
+        self.batch = batch
+        self.concurrency = concurrency
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+
+    def _session(self):
+        connector = aiohttp.UnixConnector(path=self.path) if self.path else None
+        return aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+
+    async def _post(self, session, route, data):
+        try:
+            async with session.post(self.base + route, json=data) as resp:
+                resp.raise_for_status()
+                return await resp.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+            raise NameServerError('{0}: {1!r}'.format(self.address, e)) from e
+
+    async def resolve(self, action, names):
+        """ 提交 names 的检索
+
+        return: (cache, failures)，cache 由 平台:{原始学名:检索结果} 组成，
+                failures 为请求失败的原始学名组成的集合；服务无法连接时
+                抛出 NameServerError
+        """
+        names = list(names)
+        sema = asyncio.Semaphore(self.concurrency)
+        cache, failures = {}, set()
+
+        async def post(session, batch):
+            async with sema:
+                result = await self._post(session, '/resolve', {'action': action, 'names': batch})
+            for platform, items in result['cache'].items():
+                cache.setdefault(platform, {}).update(items)
+            failures.update(result['failures'])
+
+        async with self._session() as session:
+            await asyncio.gather(*[
+                post(session, names[i:i+self.batch]) for i in range(0, len(names), self.batch)
+            ])
+        return cache, failures
+
+    async def taxa(self, keys):
+        """ 提交属、科分类阶元的检索
+
+        return: 由 (阶元, 名称):分类阶元元组 组成的字典，查无结果时为 None
+        """
+        async with self._session() as session:
+            result = await self._post(session, '/taxa', {'taxa': [list(key) for key in keys]})
+        return {(rank, name): tuple(tree) if tree else None for rank, name, tree in result['taxa']}
+
+    async def stats(self):
+        """ 获取服务的检索统计
+        """
+        async with self._session() as session:
+            try:
+                async with session.get(self.base + '/stats') as resp:
+                    resp.raise_for_status()
+                    return await resp.json()
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                raise NameServerError('{0}: {1!r}'.format(self.address, e)) from e
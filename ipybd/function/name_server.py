@@ -0,0 +1,252 @@
+""" 多个进程共用的学名检索服务
+
+同一台机器上的多个数据处理进程各自创建 BioName 时，相同的学名会被各进程
+重复检索，各进程的请求也会同时消耗上游服务的限流额度。NameServer 在一个
+长期运行的进程中持有检索缓存和各上游服务的连接池，BioName 设置 server 参数
+后只向其提交需要检索的学名，由其统一检索并返回各平台的检索结果。
+
+启动服务：
+
+    python -m ipybd.function.name_server --port 8730 --store ~/ipybd/names.db
+    python -m ipybd.function.name_server --path /tmp/ipybd-names.sock
+"""
+import argparse
+import asyncio
+import threading
+
+import pandas as pd
+from aiohttp import web
+
+from ipybd.function.bioname import ACTION_PLATFORMS, BioName
+from ipybd.function.checklist import LocalChecklist
+from ipybd.function.name_cache import MemoryNameCache, NameCache
+from ipybd.function.name_stats import NameStats
+from ipybd.function.transport import Transport
+
+
+DEFAULT_PORT = 8730
+
+
+class NameServer:
+    """ 学名检索服务
+
+    以 localhost HTTP 或者 Unix socket 提供服务，接口如下：
+        POST /resolve  {"action": action, "names": [原始学名]}
+                       返回 {"cache": {平台: {原始学名: 检索结果}}, "failures": [原始学名]}
+        POST /taxa     {"taxa": [[阶元, 名称]]}
+                       返回 {"taxa": [[阶元, 名称, 分类阶元]]}，用于 colClassification
+        GET  /stats    返回检索统计和传输层的请求统计
+    """
+
+    def __init__(self, store=None, transport=None, checklist=None, cascade='sequential',
+                 max_entries=1000000, apis=None):
+        """
+        store: 可选的 NameCache 实例或 SQLite 文件路径，作为内存缓存的持久化后端
+        transport: 可选的 Transport 实例，缺省时新建一个
+        checklist: 可选的 LocalChecklist 实例或 SQLite 文件路径
+                   SQLite 连接只能在创建它的线程中使用，以 start 在后台线程中
+                   运行服务时，store 和 checklist 应以文件路径指定
+        cascade: stdName 的检索方式，参见 BioName
+        max_entries: 每个平台在内存中缓存的最大条目数
+        apis: 可选的各平台接口地址，参见 BioName
+        """
+        # 以文件路径指定的 store 和 checklist 在运行服务的线程中打开，参见 _open
+        self.store_path = store if isinstance(store, str) else None
+        self.checklist_path = checklist if isinstance(checklist, str) else None
+        self.cache = MemoryNameCache(None if self.store_path else store, max_entries=max_entries)
+        self.transport = transport or Transport()
+        self.checklist = None if self.checklist_path else checklist
+        self.cascade = cascade
+        self.apis = apis
+        self.stats = NameStats()
+        # 各次请求共用的属、科分类阶元缓存
+        self.taxa = {}
+        # 正在检索的检索词，key 为 (检索平台, 规范化检索词)，其他请求中相同的
+        # 检索词等待其完成后直接从缓存中读取结果，不再重复检索
+        self.inflight = {}
+        self.loop = None
+        self.thread = None
+
+    def build_app(self):
+        app = web.Application(client_max_size=1024 ** 3)
+        app.router.add_post('/resolve', self.handle_resolve)
+        app.router.add_post('/taxa', self.handle_taxa)
+        app.router.add_get('/stats', self.handle_stats)
+        return app
+
+    def run(self, host='127.0.0.1', port=DEFAULT_PORT, path=None):
+        """ 在当前进程中运行服务，直至被中断
+
+        path: Unix socket 文件路径，设置后不再监听 host 和 port
+        """
+        self._open()
+        try:
+            if path:
+                web.run_app(self.build_app(), path=path)
+            else:
+                web.run_app(self.build_app(), host=host, port=port)
+        finally:
+            self._close()
+
+    def start(self, host='127.0.0.1', port=DEFAULT_PORT, path=None):
+        """ 在后台线程中运行服务
+
+        return: 服务地址，可以直接作为 BioName 的 server 参数
+        """
+        started = threading.Event()
+
+        def serve():
+            self._open()
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            self.runner = web.AppRunner(self.build_app())
+            self.loop.run_until_complete(self.runner.setup())
+            if path:
+                site = web.UnixSite(self.runner, path)
+            else:
+                site = web.TCPSite(self.runner, host, port)
+            self.loop.run_until_complete(site.start())
+            started.set()
+            self.loop.run_forever()
+            self.loop.run_until_complete(self.transport.aclose())
+            self.loop.run_until_complete(self.runner.cleanup())
+            self.loop.close()
+            self._close()
+
+        self.thread = threading.Thread(target=serve, daemon=True)
+        self.thread.start()
+        started.wait()
+        return 'unix://' + path if path else 'http://{0}:{1}'.format(host, port)
+
+    def stop(self):
+        if self.loop is not None and self.thread.is_alive():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+
+    def _open(self):
+        """ 打开以文件路径指定的 store 和 checklist
+
+        SQLite 连接只能在创建它的线程中使用，因此须在运行服务的线程中调用
+        """
+        if self.store_path:
+            self.cache.backend = NameCache(self.store_path)
+        if self.checklist_path:
+            self.checklist = LocalChecklist(self.checklist_path)
+
+    def _close(self):
+        if self.store_path and self.cache.backend is not None:
+            self.cache.backend.close()
+            self.cache.backend = None
+        if self.checklist_path and self.checklist is not None:
+            self.checklist.close()
+            self.checklist = None
+
+    def _bioname(self, names):
+        bioname = BioName(
+            pd.Series(names, dtype=object), store=self.cache, transport=self.transport,
+            cascade=self.cascade, checklist=self.checklist, stats=self.stats, apis=self.apis)
+        bioname.taxa = self.taxa
+        return bioname
+
+    async def handle_resolve(self, request):
+        data = await request.json()
+        action = data.get('action')
+        if action not in ACTION_PLATFORMS:
+            raise web.HTTPBadRequest(text='unsupported action: {}'.format(action))
+        names = data.get('names') or []
+        bioname = self._bioname(names)
+        bioname.querys = bioname.build_querys()
+        search_terms = {raw_name: query for raw_name, query in bioname.querys.items() if query}
+        bioname.failures = set()
+        platforms = ACTION_PLATFORMS[action]
+        cache = bioname._action_cache(action)
+        # owned 为本次请求负责检索的检索词，waiting 为其他请求正在检索、
+        # 本次请求只需等待其结果的原始检索词
+        owned, own_terms, waiting = {}, {}, {}
+        for raw_name, query in search_terms.items():
+            key = (platforms, bioname._cache_key(query))
+            if key in owned:
+                own_terms[raw_name] = query
+            elif key in self.inflight:
+                waiting[raw_name] = self.inflight[key]
+            else:
+                owned[key] = self.inflight[key] = asyncio.get_event_loop().create_future()
+                own_terms[raw_name] = query
+
+        def settle(query, found_only=False):
+            """ 通知等待该检索词的其他请求，结果为各平台的缓存，请求失败时为 None
+            """
+            future = owned.get((platforms, bioname._cache_key(query)))
+            raw_name = query[-1]
+            if future is None or future.done() or (found_only and raw_name not in cache):
+                return
+            if raw_name in cache:
+                future.set_result({
+                    platform: bioname.cache[platform][raw_name]
+                    for platform in platforms if raw_name in bioname.cache[platform]
+                })
+            else:
+                future.set_result(None)
+
+        # 每个检索词完成检索后立即通知，等待的请求无需等待本次请求全部完成
+        bioname.on_resolved = settle
+        try:
+            for chunk in bioname._web_chunks(action, own_terms):
+                # 从缓存中读取到结果的检索词不再检索
+                for query in own_terms.values():
+                    settle(query, found_only=True)
+                await bioname.async_web_get(action, chunk)
+                bioname._save_chunk(action, chunk)
+        finally:
+            for query in own_terms.values():
+                settle(query)
+            for key in owned:
+                del self.inflight[key]
+        if waiting:
+            await asyncio.wait(set(waiting.values()))
+        for raw_name, future in waiting.items():
+            for platform, result in (future.result() or {}).items():
+                bioname.cache[platform][raw_name] = result
+        result = {}
+        for platform in platforms:
+            result[platform] = {
+                raw_name: bioname.cache[platform][raw_name]
+                for raw_name in search_terms if raw_name in bioname.cache[platform]
+            }
+        # 未获得结果的检索词，包括其他请求检索失败的，都作为请求失败返回
+        failures = [raw_name for raw_name in search_terms if raw_name not in cache]
+        return web.json_response({'cache': result, 'failures': failures})
+
+    async def handle_taxa(self, request):
+        data = await request.json()
+        keys = {tuple(key) for key in data.get('taxa') or []}
+        bioname = self._bioname([])
+        taxa = {key for key in keys if key not in self.taxa}
+        if taxa:
+            web_taxa = bioname._load_taxa(taxa)
+            if web_taxa:
+                await bioname.async_taxa_get(web_taxa)
+                bioname._save_taxa(web_taxa)
+        return web.json_response({
+            'taxa': [[rank, name, self.taxa[(rank, name)]] for rank, name in keys if (rank, name) in self.taxa]
+        })
+
+    async def handle_stats(self, request):
+        return web.json_response({'names': self.stats.to_dict(), 'transport': self.transport.stats()})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ipybd 学名检索服务')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--path', help='Unix socket 文件路径，设置后不再监听 host 和 port')
+    parser.add_argument('--store', help='NameCache 的 SQLite 文件路径')
+    parser.add_argument('--checklist', help='LocalChecklist 的 SQLite 文件路径')
+    parser.add_argument('--cascade', default='sequential', choices=['sequential', 'parallel', 'hedged'])
+    args = parser.parse_args()
+    NameServer(args.store, checklist=args.checklist, cascade=args.cascade).run(
+        args.host, args.port, args.path)
+
+
+if __name__ == '__main__':
+    main()
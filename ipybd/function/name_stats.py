@@ -0,0 +1,164 @@
+import json
+import time
+from bisect import bisect_left
+
+
+# 请求耗时直方图各区间的上限（秒），最后一个区间收纳超出上限的请求
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# 导出统计结果时计算的耗时百分位
+PERCENTILES = (50, 90, 95, 99)
+
+
+class LatencyHistogram:
+    """ 固定区间的耗时直方图
+
+    只记录各区间的计数，内存占用与请求数无关，百分位按所在区间的上限估计，
+    且不超过观测到的最大值
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+
+    def percentile(self, q):
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.buckets[i], self.maximum) if i < len(self.buckets) else self.maximum
+        return self.maximum
+
+    def to_dict(self):
+        labels = ['<={}'.format(bound) for bound in self.buckets] + ['>{}'.format(self.buckets[-1])]
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'max': self.maximum,
+            'percentiles': {'p{}'.format(q): self.percentile(q) for q in PERCENTILES},
+            'histogram': dict(zip(labels, self.counts))
+        }
+
+
+class NameStats:
+    """ 学名检索的运行统计
+
+    由 BioName 在检索过程中记录，包括：
+        platforms: 各平台的请求数、重试数、失败数、HTTP 状态码分布和请求耗时
+        cache: 各 action 的检索词在内存缓存、本地缓存（store）、检查点中的
+               命中数，以及需要 WEB 检索的检索词数
+        cascade: stdName 依次检索 IPNI、POWO、Tropicos、COL 时，各平台给出
+                 结果的学名数，查无结果（unresolved）和请求失败（failed）的学名数
+        actions: 各 action 的调用次数、检索词数和端到端耗时
+
+    同一个 NameStats 可以由多个 BioName 共用，to_dict、to_json 导出的结果可以
+    直接推送至监控系统。
+    """
+
+    def __init__(self):
+        self.start = time.time()
+        self.platforms = {}
+        self.cache = {}
+        self.cascade = {}
+        self.actions = {}
+
+    def _platform(self, platform):
+        if platform not in self.platforms:
+            self.platforms[platform] = {
+                'requests': 0, 'retries': 0, 'failures': 0,
+                'statuses': {}, 'latency': LatencyHistogram()
+            }
+        return self.platforms[platform]
+
+    def record_request(self, platform, status, latency, attempt=0):
+        """ 记录一次 HTTP 请求，由 Transport.request_json 在每次请求完成后调用
+
+        status: HTTP 状态码，请求出错时为 None
+        latency: 请求耗时（秒）
+        attempt: 该请求是第几次重试，首次请求为 0
+        """
+        counter = self._platform(platform)
+        counter['requests'] += 1
+        if attempt:
+            counter['retries'] += 1
+        status = 'error' if status is None else status
+        counter['statuses'][status] = counter['statuses'].get(status, 0) + 1
+        counter['latency'].add(latency)
+
+    def record_failure(self, platform):
+        """ 记录一次重试用尽或者结果无法解析的请求
+        """
+        self._platform(platform)['failures'] += 1
+
+    def record_cache(self, action, memory=0, store=0, checkpoint=0, web=0):
+        """ 记录一次检索中各级缓存的命中数和需要 WEB 检索的检索词数
+        """
+        counter = self.cache.setdefault(
+            action, {'memory': 0, 'store': 0, 'checkpoint': 0, 'web': 0})
+        counter['memory'] += memory
+        counter['store'] += store
+        counter['checkpoint'] += checkpoint
+        counter['web'] += web
+
+    def record_cascade(self, outcome):
+        """ 记录 stdName 检索中一个学名的最终结果来源
+
+        outcome: 给出结果的平台名称，或者 'unresolved'、'failed'
+        """
+        self.cascade[outcome] = self.cascade.get(outcome, 0) + 1
+
+    def record_action(self, action, names, seconds):
+        """ 记录一次 get 调用的检索词数和端到端耗时
+        """
+        counter = self.actions.setdefault(
+            action, {'calls': 0, 'names': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+        counter['calls'] += 1
+        counter['names'] += names
+        counter['seconds'] += seconds
+        counter['max_seconds'] = max(counter['max_seconds'], seconds)
+
+    def to_dict(self):
+        platforms = {}
+        for platform, counter in self.platforms.items():
+            statuses = counter['statuses']
+            platforms[platform] = {
+                'requests': counter['requests'],
+                'retries': counter['retries'],
+                'failures': counter['failures'],
+                'throttled': statuses.get(429, 0),
+                'statuses': {str(status): count for status, count in statuses.items()},
+                'latency': counter['latency'].to_dict()
+            }
+        cache = {}
+        for action, counter in self.cache.items():
+            total = sum(counter.values())
+            cache[action] = dict(
+                counter, hit_rate=(total - counter['web']) / total if total else None)
+        return {
+            'start': self.start,
+            'elapsed': time.time() - self.start,
+            'platforms': platforms,
+            'cache': cache,
+            'cascade': dict(self.cascade),
+            'actions': {action: dict(counter) for action, counter in self.actions.items()}
+        }
+
+    def to_json(self, **kwargs):
+        """ kwargs: 传递给 json.dumps 的参数，如 indent
+        """
+        return json.dumps(self.to_dict(), ensure_ascii=False, **kwargs)
+
+    def reset(self):
+        self.__init__()
@@ -0,0 +1,80 @@
+""" ipybd/lib 中参考数据文件的进程级缓存
+
+行政区划、字段别名、选值别名等参考数据在同一进程中会被多个值处理类、
+多个数据表反复使用，这里在首次使用时解析一次，之后直接返回解析结果，
+文件的修改时间或大小变化后重新解析。
+"""
+import json
+import os
+import threading
+
+
+LIB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'lib')
+
+
+class ReferenceRegistry:
+    """ 参考数据文件的解析结果缓存
+
+    同一文件可以以不同的 build 函数预处理，如生成索引，缓存中只保留预处理
+    后的结果。返回的对象由所有使用者共用，不能修改。
+    """
+
+    def __init__(self):
+        # key 为 (文件路径, build)，value 为 (文件修改时间, 文件大小, 解析结果)
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def path(self, name):
+        """ name: ipybd/lib 中的文件名，或者文件的完整路径
+        """
+        if os.path.isabs(name):
+            return name
+        return os.path.join(LIB_PATH, name)
+
+    def load(self, name, build=None):
+        """ 读取参考数据文件的解析结果
+
+        build: 可选的预处理函数，接收 json 解析结果，返回需要缓存的对象
+        """
+        path = self.path(name)
+        stat = os.stat(path)
+        key = (path, build)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[:2] != (stat.st_mtime_ns, stat.st_size):
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if build is not None:
+                    data = build(data)
+                entry = self.entries[key] = (stat.st_mtime_ns, stat.st_size, data)
+        return entry[2]
+
+    def invalidate(self, name=None):
+        """ 清除某一文件或全部文件的解析结果，文件被改写后调用
+        """
+        with self.lock:
+            if name is None:
+                self.entries.clear()
+            else:
+                path = self.path(name)
+                for key in [key for key in self.entries if key[0] == path]:
+                    del self.entries[key]
+
+
+REFERENCES = ReferenceRegistry()
+
+
+def load_reference(name, build=None):
+    return REFERENCES.load(name, build)
+
+
+class ReferenceAttribute:
+    """ 以类属性的方式读取参考数据文件，每次访问时检查文件是否有更新
+    """
+
+    def __init__(self, name, build=None):
+        self.name = name
+        self.build = build
+
+    def __get__(self, obj, owner):
+        return load_reference(self.name, self.build)
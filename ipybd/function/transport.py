@@ -0,0 +1,494 @@
+import asyncio
+import atexit
+import random
+import time
+import weakref
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import aiohttp
+
+
+# 各上游服务的并发数和每秒请求数限制，统一在此调整
+# rps 为 None 表示不限制请求频率
+# adaptive 为 True 时，并发数由 AdaptiveLimiter 根据服务端的响应情况自动调整，
+# 此时 concurrency 为并发数的上限，initial 为初始并发数，latency 为期望的
+# 请求耗时（秒），请求耗时持续高于该值时会主动降低并发数
+HOST_LIMITS = {
+    'www.sp2000.org.cn': {'concurrency': 100, 'rps': None, 'adaptive': True, 'initial': 20, 'latency': 10},
+    'beta.ipni.org': {'concurrency': 200, 'rps': None, 'adaptive': True, 'initial': 50, 'latency': 10},
+    'powo.science.kew.org': {'concurrency': 200, 'rps': None, 'adaptive': True, 'initial': 50, 'latency': 10},
+    'services.tropicos.org': {'concurrency': 100, 'rps': None, 'adaptive': True, 'initial': 20, 'latency': 10},
+    'www.cvh.ac.cn': {'concurrency': 50, 'rps': None},
+    'noi.link': {'concurrency': 100, 'rps': None}
+}
+
+DEFAULT_LIMIT = {'concurrency': 100, 'rps': None}
+
+# 统计请求吞吐量的时间窗口（秒）
+THROUGHPUT_PERIOD = 10
+
+
+class RetryPolicy:
+    """ 异步请求的重试策略
+
+    对限流（429）、服务端错误以及网络连接错误进行有限次数的重试，
+    重试间隔按指数退避并加入随机抖动，服务端返回 Retry-After 时优先遵从
+    """
+
+    def __init__(self, attempts=5, backoff=1, max_backoff=60,
+                 statuses=(429, 500, 502, 503, 504), jitter=True,
+                 exceptions=(aiohttp.ClientError, asyncio.TimeoutError),
+                 retry_invalid_json=False):
+        """
+        attempts: 最多请求次数（包括首次请求）
+        backoff: 指数退避的基础间隔（秒）
+        max_backoff: 单次重试的最长等待时间（秒）
+        statuses: 需要重试的 HTTP 状态码
+        jitter: 是否在退避间隔中加入随机抖动，以避免大量请求同时重试
+        exceptions: 需要重试的异常类型
+        retry_invalid_json: 返回内容无法解析为 JSON 时是否重试
+        """
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = set(statuses)
+        self.jitter = jitter
+        self.exceptions = exceptions
+        self.retry_invalid_json = retry_invalid_json
+
+    def delay(self, attempt, retry_after=None):
+        """ 计算第 attempt 次请求失败后需要等待的时间（秒）
+        """
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+        if self.jitter:
+            # full jitter
+            return random.uniform(0, delay)
+        return delay
+
+    def retry_after(self, headers):
+        """ 解析 Retry-After 响应头，返回需要等待的秒数，无法解析返回 None
+        """
+        value = headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0, float(value))
+        except ValueError:
+            pass
+        try:
+            date = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=timezone.utc)
+        return max(0, (date - datetime.now(timezone.utc)).total_seconds())
+
+
+DEFAULT_RETRY = RetryPolicy()
+
+
+class RateLimiter:
+    """ 限制单个上游服务每秒发起的请求数
+    """
+
+    def __init__(self, rps):
+        self.interval = 1 / rps
+        self.next_time = 0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self.lock:
+            now = time.monotonic()
+            delay = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class HostLimiter:
+    """ 单个上游服务的并发数和请求频率控制
+    """
+
+    def __init__(self, concurrency, rps=None):
+        self.concurrency = concurrency
+        self.sema = asyncio.Semaphore(concurrency)
+        self.rate = RateLimiter(rps) if rps else None
+        self.inflight = 0
+        self.completed = deque()
+
+    async def acquire(self):
+        await self.sema.acquire()
+        self.inflight += 1
+        if self.rate:
+            await self.rate.wait()
+
+    async def release(self, status=None, latency=0.0, feedback=True):
+        """ 释放并发名额
+
+        status: 响应的 HTTP 状态码，请求出错时为 None
+        latency: 请求耗时（秒）
+        feedback: 是否将本次请求结果计入并发调整，被主动取消的请求不应计入
+        """
+        self.inflight -= 1
+        self._record()
+        self.sema.release()
+
+    def _record(self):
+        now = time.monotonic()
+        self.completed.append(now)
+        while self.completed and now - self.completed[0] > THROUGHPUT_PERIOD:
+            self.completed.popleft()
+
+    def throughput(self):
+        """ 最近 THROUGHPUT_PERIOD 秒内每秒完成的请求数
+        """
+        now = time.monotonic()
+        while self.completed and now - self.completed[0] > THROUGHPUT_PERIOD:
+            self.completed.popleft()
+        return len(self.completed) / THROUGHPUT_PERIOD
+
+    def stats(self):
+        return {
+            'window': self.concurrency,
+            'inflight': self.inflight,
+            'throughput': self.throughput()
+        }
+
+
+class AdaptiveLimiter(HostLimiter):
+    """ 按 AIMD（加性增、乘性减）策略自动调整单个上游服务的并发数
+
+    请求正常完成时，并发窗口每轮约增加 1；遇到限流（429）、服务端错误、
+    网络错误或者请求耗时超过期望值时，并发窗口减半，且在一次请求耗时内
+    最多减半一次，以免一批同时失败的请求使窗口骤降至最小值。
+    """
+
+    def __init__(self, concurrency, rps=None, initial=20, minimum=1, latency=None, decrease=0.5):
+        """
+        concurrency: 并发窗口的上限
+        rps: 每秒最多发起的请求数
+        initial: 初始并发窗口
+        minimum: 并发窗口的下限
+        latency: 期望的请求耗时（秒），为 None 时不根据耗时调整窗口
+        decrease: 窗口的乘性缩减系数
+        """
+        self.maximum = concurrency
+        self.minimum = minimum
+        self.window = float(min(initial, concurrency))
+        self.latency = latency
+        self.decrease = decrease
+        self.rate = RateLimiter(rps) if rps else None
+        self.inflight = 0
+        self.completed = deque()
+        self.throttled = 0
+        self.mean_latency = None
+        self.last_decrease = 0
+        self.cond = asyncio.Condition()
+
+    async def acquire(self):
+        async with self.cond:
+            await self.cond.wait_for(lambda: self.inflight < int(self.window))
+            self.inflight += 1
+        if self.rate:
+            await self.rate.wait()
+
+    async def release(self, status=None, latency=0.0, feedback=True):
+        async with self.cond:
+            self.inflight -= 1
+            self._record()
+            if feedback:
+                self.feedback(status, latency)
+            self.cond.notify_all()
+
+    def feedback(self, status, latency):
+        """ 根据请求结果调整并发窗口
+        """
+        if self.mean_latency is None:
+            self.mean_latency = latency
+        else:
+            self.mean_latency = 0.8 * self.mean_latency + 0.2 * latency
+        overloaded = status is None or status == 429 or status >= 500
+        if overloaded:
+            self.throttled += 1
+        if overloaded or (self.latency and self.mean_latency > self.latency):
+            now = time.monotonic()
+            if now - self.last_decrease > self.mean_latency:
+                self.window = max(self.minimum, self.window * self.decrease)
+                self.last_decrease = now
+        else:
+            self.window = min(self.maximum, self.window + 1 / self.window)
+
+    def stats(self):
+        return {
+            'window': int(self.window),
+            'inflight': self.inflight,
+            'throughput': self.throughput(),
+            'throttled': self.throttled,
+            'mean_latency': self.mean_latency
+        }
+
+
+class Transport:
+    """ bioname、cvh、noi 共用的 HTTP 传输层
+
+    在同一个事件循环中长期持有一个带连接池的 aiohttp.ClientSession，
+    连接保持 keep-alive 并缓存 DNS 解析结果，以便连续多次的批量请求能够
+    复用已经建立的连接；同时按上游服务分别限制并发数和请求频率，统一执行
+    重试策略，并记录各上游服务的请求数、重试数和耗时。
+    """
+
+    def __init__(self, limits=None, policy=DEFAULT_RETRY, timeout=60,
+                 pool_size=500, keepalive_timeout=60, ttl_dns_cache=300):
+        """
+        limits: host:{'concurrency': n, 'rps': m} 组成的字典，用于覆盖 HOST_LIMITS
+        policy: 默认的 RetryPolicy
+        timeout: 单次请求的超时时间（秒）
+        pool_size: 连接池的最大连接数
+        keepalive_timeout: 空闲连接的保持时间（秒）
+        ttl_dns_cache: DNS 解析结果的缓存时间（秒）
+        """
+        self.limits = {host: dict(limit) for host, limit in HOST_LIMITS.items()}
+        if limits:
+            for host, limit in limits.items():
+                self.limits.setdefault(host, dict(DEFAULT_LIMIT)).update(limit)
+        self.policy = policy
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+        self.counters = {}
+        self.loop = None
+        # 连接池和并发控制都与事件循环绑定，这里按事件循环分别保存
+        self._states = weakref.WeakKeyDictionary()
+
+    def run(self, coro):
+        """ 在 Transport 持有的事件循环中执行协程
+
+        同步调用时使用，事件循环会一直保留，以便复用其中的连接池
+        """
+        if self.loop is None or self.loop.is_closed():
+            self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        return self.loop.run_until_complete(coro)
+
+    def session(self):
+        """ 获取当前事件循环中的共享 ClientSession
+        """
+        state = self._state()
+        if state['session'] is None or state['session'].closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.ttl_dns_cache
+            )
+            state['session'] = aiohttp.ClientSession(connector=connector)
+            # 持有未关闭连接池的 Transport 在进程退出时统一关闭
+            _open_transports.add(self)
+            loop = asyncio.get_event_loop()
+            if loop is not self.loop and state['closer'] is None:
+                self._close_with_loop(loop, state)
+        return state['session']
+
+    def _close_with_loop(self, loop, state):
+        """ 调用者的事件循环结束时关闭其中的连接池
+
+        asyncio.run 等在关闭事件循环前会调用 loop.shutdown_asyncgens()，
+        届时这里挂起的异步生成器将被终结，并在 finally 中关闭连接池
+        """
+        async def closing():
+            try:
+                yield
+            finally:
+                state['closer'] = None
+                await self._close_session(state)
+
+        async def start():
+            await state['closer'].asend(None)
+
+        state['closer'] = closing()
+        loop.create_task(start())
+
+    async def _close_session(self, state):
+        # 主动关闭时一并终结尚未触发的异步生成器
+        closer, state['closer'] = state['closer'], None
+        if closer is not None:
+            await closer.aclose()
+        if state['session'] is not None and not state['session'].closed:
+            await state['session'].close()
+        if not any(other['session'] is not None and not other['session'].closed
+                   for other in self._states.values()):
+            _open_transports.discard(self)
+
+    def limiter(self, host):
+        state = self._state()
+        if host not in state['limiters']:
+            limit = self.limits.get(host, DEFAULT_LIMIT)
+            if limit.get('adaptive'):
+                state['limiters'][host] = AdaptiveLimiter(
+                    limit['concurrency'], limit.get('rps'),
+                    initial=limit.get('initial', 20), latency=limit.get('latency'))
+            else:
+                state['limiters'][host] = HostLimiter(
+                    limit['concurrency'], limit.get('rps'))
+        return state['limiters'][host]
+
+    def _state(self):
+        loop = asyncio.get_event_loop()
+        if loop not in self._states:
+            self._states[loop] = {'session': None, 'limiters': {}, 'closer': None}
+        return self._states[loop]
+
+    def _counter(self, host):
+        if host not in self.counters:
+            self.counters[host] = {
+                'requests': 0, 'retries': 0, 'failures': 0,
+                'statuses': {}, 'latency': 0.0, 'max_latency': 0.0
+            }
+        return self.counters[host]
+
+    async def request_json(self, url, method='GET', session=None, policy=None,
+                           content_type='application/json', stats=None, label=None, **kwargs):
+        """ 发起异步请求并解析 JSON 结果
+
+        url: 请求地址
+        method: 请求方法
+        session: 可选的 aiohttp.ClientSession，缺省时使用共享的连接池
+        policy: RetryPolicy 重试策略，缺省时使用 self.policy
+        content_type: 传递给 resp.json 的 content_type 参数
+        stats: 可选的 NameStats 等统计对象，每次请求完成后调用其 record_request，
+               请求最终失败时调用其 record_failure
+        label: 在 stats 中记录的名称，缺省时为 host
+        kwargs: 传递给 session.request 的其他参数，如 headers、data
+
+        return: 解析后的 JSON 对象，重试次数用尽或者结果无法解析时返回 None
+        """
+        policy = policy or self.policy
+        session = session or self.session()
+        host = urlsplit(url).netloc
+        counter = self._counter(host)
+        label = label or host
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        for attempt in range(policy.attempts):
+            retry_after = None
+            if attempt:
+                counter['retries'] += 1
+            # 重试等待期间不占用并发名额
+            limiter = self.limiter(host)
+            await limiter.acquire()
+            counter['requests'] += 1
+            status = None
+            cancelled = False
+            start = time.monotonic()
+            try:
+                async with session.request(method, url, timeout=timeout, **kwargs) as resp:
+                    status = resp.status
+                    counter['statuses'][status] = counter['statuses'].get(status, 0) + 1
+                    if status in policy.statuses:
+                        retry_after = policy.retry_after(resp.headers)
+                    else:
+                        try:
+                            return await resp.json(content_type=content_type)
+                        except (aiohttp.ContentTypeError, ValueError):
+                            # 返回的内容不是合法的 JSON，通常重试也无济于事
+                            if not policy.retry_invalid_json:
+                                counter['failures'] += 1
+                                if stats is not None:
+                                    stats.record_failure(label)
+                                return None
+            except asyncio.CancelledError:
+                # 对冲检索等场景下被调用者主动取消的请求，不视为上游服务过载
+                cancelled = True
+                raise
+            except policy.exceptions:
+                pass
+            except aiohttp.ClientError:
+                counter['failures'] += 1
+                if stats is not None:
+                    stats.record_failure(label)
+                return None
+            finally:
+                latency = time.monotonic() - start
+                counter['latency'] += latency
+                counter['max_latency'] = max(counter['max_latency'], latency)
+                if stats is not None and not cancelled:
+                    stats.record_request(label, status, latency, attempt)
+                await limiter.release(status, latency, feedback=not cancelled)
+            if attempt < policy.attempts - 1:
+                await asyncio.sleep(policy.delay(attempt, retry_after))
+        counter['failures'] += 1
+        if stats is not None:
+            stats.record_failure(label)
+        return None
+
+    def stats(self):
+        """ 返回各上游服务的请求统计
+
+        除累计的请求数、重试数和耗时外，还包括各上游服务在最近使用的事件循环中
+        当前的并发窗口（window）、正在执行的请求数（inflight）和每秒完成的请求数
+        （throughput），可用于判断批量检索变慢的原因
+        """
+        stats = {}
+        for host, counter in self.counters.items():
+            stats[host] = dict(counter, statuses=dict(counter['statuses']))
+            stats[host]['mean_latency'] = (
+                counter['latency'] / counter['requests'] if counter['requests'] else 0.0)
+        for state in self._states.values():
+            for host, limiter in state['limiters'].items():
+                stats.setdefault(host, {})['limiter'] = limiter.stats()
+        return stats
+
+    async def aclose(self):
+        """ 关闭当前事件循环中的 ClientSession
+        """
+        await self._close_session(self._state())
+
+    def close(self):
+        """ 关闭 Transport 持有的事件循环以及其他已经停止的事件循环中的连接池
+
+        仍在运行的调用者事件循环中的连接池会在该循环结束时关闭，
+        也可以在其中 await aclose() 主动关闭
+        """
+        for loop, state in list(self._states.items()):
+            if not loop.is_closed() and not loop.is_running():
+                loop.run_until_complete(self._close_session(state))
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+# 持有未关闭连接池的 Transport，以免其在连接池关闭前被回收
+_open_transports = set()
+
+
+@atexit.register
+def _close_transports():
+    for transport in list(_open_transports):
+        transport.close()
+
+
+_transport = None
+
+
+def get_transport():
+    """ 获取进程内共享的 Transport 实例
+    """
+    global _transport
+    if _transport is None:
+        _transport = Transport()
+    return _transport
@@ -1,11 +1,12 @@
 from argparse import ArgumentError
 import asyncio
-import aiohttp
 import requests
 from time import sleep
 from tqdm import tqdm
 import urllib
 
+from ipybd.function.transport import get_transport
+
 
 QUERY_API = 'https://www.cvh.ac.cn/controller/spms/list.php?'
 INFO_API = 'https://www.cvh.ac.cn/controller/spms/detail.php?'
@@ -13,10 +14,11 @@ WEB_URL = 'https://www.cvh.ac.cn/spms/detail.php?'
 
 
 class LinkCVH:
-    def __init__(self, cache=True, detail=False):
+    def __init__(self, cache=True, detail=False, transport=None):
         self.enable_cache = cache
         self.cache = {}
         self.detail = detail
+        self.transport = transport or get_transport()
 
     def build_cache(self, results):
         for res in results:
@@ -67,45 +69,36 @@ class LinkCVH:
         return: 返回由字典组成的列表，每个字典为一个查询结果
         """
         self.pbar = tqdm(total=len(pages_or_ids), desc='列表数据获取', ascii=True)
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        self.sema = asyncio.Semaphore(50)
+        # 并发数由共享传输层按上游服务统一控制
         tasks = self.build_tasks(api, params, headers, pages_or_ids)
-        results = loop.run_until_complete(tasks)
-        # 修复 Windows 下出现的 RuntimeErro: Event loop is closed
-        # 为什么注销 close 会管用，我也没完全搞清楚
-        # 猜测可能是 asyncio 会自动关闭 loop
-        # 暂且先这样吧！
-        # loop.close()
+        results = self.transport.run(tasks)
         self.pbar.close()
         return results
 
-    async def build_tasks(self, api, params, headers, pages_or_ids):
-        async with aiohttp.ClientSession() as session:
-            tasks = [
-                self.get_track(
-                    self.build_url(api, params, arg),
-                    headers,
-                    session
-                )
-                for arg in pages_or_ids
-            ]
-            return await asyncio.gather(*tasks)
+    async def build_tasks(self, api, params, headers, pages_or_ids, session=None):
+        tasks = [
+            self.get_track(
+                self.build_url(api, params, arg),
+                headers,
+                session
+            )
+            for arg in pages_or_ids
+        ]
+        return await asyncio.gather(*tasks)
 
     async def get_track(self, url, headers, session):
-        async with self.sema:
-            response = await self.async_get(url, headers, session)
-            self.pbar.update(1)
-            result = response['rows']
-            # 将 detail 的结果中 uuid 改名为 collectionID
-            # 以便遵从 DarwinCore ，同时与非 detail 模式下
-            # 返回的页面列表结果保持统一
-            try:
-                result['collectionID'] = result['uuid']
-                del result['uuid']
-            except TypeError:
-                pass
-            return result
+        response = await self.async_get(url, headers, session)
+        self.pbar.update(1)
+        result = response['rows']
+        # 将 detail 的结果中 uuid 改名为 collectionID
+        # 以便遵从 DarwinCore ，同时与非 detail 模式下
+        # 返回的页面列表结果保持统一
+        try:
+            result['collectionID'] = result['uuid']
+            del result['uuid']
+        except TypeError:
+            pass
+        return result
 
     def build_url(self, api, params, page_or_id=False):
         if isinstance(page_or_id, int):
@@ -118,34 +111,12 @@ class LinkCVH:
         )
 
     async def async_get(self, url, headers, session):
-        try:
-            while True:
-                # print(url)
-                async with session.get(url, headers=headers, timeout=60) as resp:
-                    if resp.status == 429:
-                        await asyncio.sleep(10)
-                    else:
-                        response = await resp.json()
-                        # print(response)
-                        break
-        except BaseException:  # 如果异步请求出错，改为正常的 Get 请求以尽可能确保有返回结果
-            response = await self.single_get(url, headers)
+        # 请求失败时以指数退避方式异步重试，不会阻塞事件循环
+        response = await self.transport.request_json(url, session=session, headers=headers)
         if not response:
             print(url, "联网超时，请检查网络连接！")
         return response  # 返回 None 表示网络有问题
 
-    async def single_get(self, url, headers):
-        try:
-            while True:
-                rps = requests.get(url, headers=headers)
-                # print(rps.status_code)
-                if rps.status_code == 429:
-                    await asyncio.sleep(10)
-                else:
-                    return rps.json()
-        except BaseException:
-            return None
-
     def query(self, api, params, headers):
         while True:
             rps = requests.get(api, params, headers=headers)
@@ -14,18 +14,28 @@ import json
 import urllib.parse
 import urllib.request
 from hashlib import sha1
-from json.decoder import JSONDecodeError
 
 import aiohttp
 from tqdm import tqdm
 
 from ipybd.core import NpEncoder
+from ipybd.function.transport import RetryPolicy, get_transport
 
 URL = "https://noi.link/api/data_add"
 UPDATE_ID_URL = "https://noi.link/api/data_update"
 ACCESSKEY = ""
 SECRETKEY = ""
 
+# 注册请求遇到 ClientPayloadError 时，相应记录可能已经注册成功，
+# 因此不再重试，以免重复注册；而返回内容无法解析（数据库端 401）时
+# 记录并未注册成功，需要重新注册
+NOI_RETRY = RetryPolicy(
+    attempts=8,
+    exceptions=(aiohttp.ServerDisconnectedError, aiohttp.ClientOSError,
+                ConnectionResetError, asyncio.TimeoutError),
+    retry_invalid_json=True
+)
+
 
 class Api:
     """ noi.link Post Data API
@@ -79,11 +89,12 @@ class Link:
         对于未注册成功的记录，会以json文件保存在相应路径下
         对于已经注册成功的记录，会议json文件将返回结果保存在相应路径下
     """
-    def __init__(self, dict_in_list_datas, file_path, accesskey, secretkey, model_id=1):
+    def __init__(self, dict_in_list_datas, file_path, accesskey, secretkey, model_id=1, transport=None):
         self.datas = dict_in_list_datas
         self.model_id = model_id
         self.file_path = file_path
         self.url = URL
+        self.transport = transport or get_transport()
         global ACCESSKEY
         global SECRETKEY
         ACCESSKEY = accesskey
@@ -109,25 +120,21 @@ class Link:
 
     def add(self):
         self.pbar = tqdm(total=len(self.datas), desc="注册数据", ascii=True)
-        loop = asyncio.get_event_loop()
-        self.sem = asyncio.Semaphore(100)
+        # 并发数由共享传输层按上游服务统一控制
         tasks = self.build_tasks()
-        resp = loop.run_until_complete(tasks)
-        loop.close()
+        resp = self.transport.run(tasks)
         self.pbar.close()
         return resp
 
-    async def build_tasks(self):
-        async with aiohttp.ClientSession() as session:
-            tasks = [self.limit_sem(data, session) for data in self.datas]
-            return await asyncio.gather(*tasks)
+    async def build_tasks(self, session=None):
+        tasks = [self.limit_sem(data, session) for data in self.datas]
+        return await asyncio.gather(*tasks)
 
     async def limit_sem(self, data, session):
-        async with self.sem:
-            postdata, token = self.build_post_data(data)
-            result = await self.fetch(postdata, token, session)
-            self.pbar.update(1)
-            return result
+        postdata, token = self.build_post_data(data)
+        result = await self.fetch(postdata, token, session)
+        self.pbar.update(1)
+        return result
 
     def build_post_data(self, data: dict):
         rights = data["Record"]["rightsHolder"]
@@ -142,43 +149,18 @@ class Link:
         return api.build_post_info()
 
     async def fetch(self, data: 'json', token, session):
-        while True:
-            try:
-                async with session.post(self.url,
-                                        data=data,
-                                        headers={"token": token}
-                                        ) as resp:
-                    if resp.status == 429:
-                        await asyncio.sleep(3)
-                        continue
-                    elif resp.status == 200:
-                        try:
-                            response = await resp.json(content_type='text')
-                            return self.get_data(response)
-                        except aiohttp.ClientPayloadError as e:
-                            # 这个错误的具体原因尚未弄清楚
-                            # 在遭遇这个错误之后，我们验证了 noi 数据库
-                            # 发现相应的索引其实已经注册
-                            # 但这到目前这只是个例，且原因不明，
-                            # 所以权衡之下，先返回 None 以默认未注册成功
-                            # 同时也不再循环注册，后续是否继续注册，交由用户自行决定
-                            return None
-                        except JSONDecodeError as e:
-                            # 这个错误，目前原因不明
-                            # 数据库端解析请求，提示 401 错误
-                            # 索引数据没有注册成功，sleep后重新执行注册
-                            await asyncio.sleep(5)
-                            continue
-            except aiohttp.ServerDisconnectedError:
-                # print(">server connect error! May be you are too fast!\n")
-                await asyncio.sleep(3)
-                continue
-            except (ConnectionResetError, aiohttp.ClientOSError):
-                await asyncio.sleep(3)
-                continue
-            except asyncio.TimeoutError:
-                await asyncio.sleep(3)
-                continue
+        response = await self.transport.request_json(
+            self.url,
+            method='POST',
+            session=session,
+            policy=NOI_RETRY,
+            content_type='text',
+            data=data,
+            headers={"token": token}
+        )
+        if response is None:
+            return None
+        return self.get_data(response)
 
     def get_data(self, response):
         if response['code'] == 200:
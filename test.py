@@ -232,3 +232,27 @@ authors = [
 # 同首倒置
 ('Kze ; Kl', 'Kl ; Kze')
 ]
+
+
+# 学名检索服务
+import os
+import sys
+import tempfile
+
+from ipybd import BioName
+from ipybd.function.name_cache import NameCache
+from ipybd.function.name_server import NameServer
+
+sys.path.insert(0, 'benchmarks')
+from mock_server import MockApiServer
+
+with MockApiServer() as mock, tempfile.TemporaryDirectory() as folder:
+    store = os.path.join(folder, 'names.db')
+    server = NameServer(store=store, apis=mock.apis)
+    address = server.start(port=8731)
+    test = BioName(['Abies fabri (Mast.) Craib', 'Poa annua L.'], server=address)
+    print(test.get('stdName'))
+    # 服务无法使用时 BioName 会改为直接检索，并将 server 置为 None
+    assert test.server is not None
+    server.stop()
+    assert len(NameCache(store)) > 0